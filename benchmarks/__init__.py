@@ -0,0 +1,12 @@
+"""Micro-benchmarks comparing :any:`dkey.deprecate_keys` against plain dicts.
+
+Run a benchmark module from the repository root, e.g.::
+
+    python -m benchmarks.bench_lookup
+
+:any:`benchmarks.suite` runs all tracked cases and fails if one of them got
+slower relative to a plain dict than its threshold allows::
+
+    python -m benchmarks.suite
+
+"""
@@ -0,0 +1,70 @@
+"""Helpers shared by the benchmark modules."""
+
+import timeit
+
+
+def best_of(stmt, namespace, number, repeat=5):
+    """
+    Return the best time per execution of `stmt` in seconds.
+
+    Parameters
+    ----------
+    stmt : str
+        The statement to time
+    namespace : dict
+        The globals the statement is executed in
+    number : int
+        How often `stmt` is executed per measurement
+    repeat : int, optional
+        How many measurements to take. The fastest one is used.
+
+    Returns
+    -------
+    float
+        The time of a single execution of `stmt`.
+
+    """
+    timer = timeit.Timer(stmt, globals=namespace)
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def compare(label, stmt, dkey_namespace, dict_namespace, number=100000, repeat=5):
+    """
+    Time `stmt` once against a wrapped dict and once against a plain dict.
+
+    Both namespaces have to provide the names used by `stmt`.
+
+    Parameters
+    ----------
+    label : str
+        Name of the measurement used in the printed report
+    stmt : str
+        The statement to time
+    dkey_namespace : dict
+        Globals containing the :any:`dkey.deprecate_keys` objects
+    dict_namespace : dict
+        Globals containing the plain dict objects
+    number : int, optional
+        How often `stmt` is executed per measurement
+    repeat : int, optional
+        How many measurements to take. The fastest one is used.
+
+    Returns
+    -------
+    float
+        The ratio between the time taken with the wrapped and with the plain dict.
+
+    """
+    dkey_time = best_of(stmt, dkey_namespace, number, repeat)
+    dict_time = best_of(stmt, dict_namespace, number, repeat)
+    ratio = dkey_time / dict_time
+    print(f'{label:<50} {dkey_time * 1e9:>12.1f} ns {dict_time * 1e9:>12.1f} ns {ratio:>8.2f}x')
+
+    return ratio
+
+
+def print_header(title):
+    """Print the table header used by :any:`compare`."""
+    print()
+    print(title)
+    print(f'{"":<50} {"dkey":>15} {"dict":>15} {"ratio":>9}')
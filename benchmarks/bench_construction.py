@@ -0,0 +1,52 @@
+"""Benchmark wrapping dicts of different sizes with different numbers of deprecations."""
+
+from dkey import deprecate_keys, deprecation_schema, dkey
+
+from ._timing import best_of
+
+
+def main():
+    """Print the construction time relative to copying the dict with :any:`dict`."""
+    print(f'{"size":>8} {"deprecations":>13} {"dkey":>14} {"dict":>14} {"ratio":>8}')
+    for size in (1000, 100000, 1000000):
+        data = {f'key {i}': i for i in range(size)}
+        number = max(1, 100000 // size)
+        dict_time = best_of('dict(data)', {'data': data}, number, repeat=3)
+        for deprecations in (0, 10, 100):
+            step = size // deprecations if deprecations else 1
+            schema = deprecation_schema(*(dkey(f'old key {i}', f'key {i}') for i in range(0, size, step)[:deprecations]))
+            namespace = {'deprecate_keys': deprecate_keys, 'data': data, 'schema': schema}
+            dkey_time = best_of('deprecate_keys(data, schema)', namespace, number, repeat=3)
+            print(f'{size:>8} {deprecations:>13} {dkey_time * 1e3:>11.3f} ms {dict_time * 1e3:>11.3f} ms '
+                  f'{dkey_time / dict_time:>7.2f}x')
+
+    print()
+    print(f'{"schema entries":>14} {"build":>14} {"rebuild":>14}')
+    for entries in (1000, 10000):
+        old_keys = [f'old key {i}' for i in range(entries)]
+        new_keys = [f'key {i}' for i in range(entries)]
+        stmt = 'deprecation_schema(*map(lambda old, new: dkey(old, new, removed_in="2.0"), old_keys, new_keys))'
+        namespace = {'deprecation_schema': deprecation_schema, 'dkey': dkey, 'old_keys': old_keys,
+                     'new_keys': new_keys}
+        # The first build creates the records, later builds reuse the records of identical dkey calls.
+        first_time = best_of(stmt, namespace, 1, repeat=1)
+        rebuild_time = best_of(stmt, namespace, 1, repeat=3)
+        print(f'{entries:>14} {first_time * 1e3:>11.3f} ms {rebuild_time * 1e3:>11.3f} ms')
+
+    print()
+    print(f'{"expired":>8} {"":<8} {"construction":>14} {"iteration":>14}')
+    data = {f'key {i}': i for i in range(10000)}
+    for expired in (0, 100, 1000):
+        deprecations = [dkey(f'old key {i}', f'key {i}', removed_in='1.0' if i < expired else '3.0')
+                        for i in range(expired + 10)]
+        for label, current_version in (('kept', None), ('pruned', '2.0')):
+            schema = deprecation_schema(*deprecations, current_version=current_version)
+            namespace = {'deprecate_keys': deprecate_keys, 'data': data, 'schema': schema,
+                         'wrapped': deprecate_keys(data, schema)}
+            construction = best_of('deprecate_keys(data, schema)', namespace, 10, repeat=3)
+            iteration = best_of('for key in wrapped: pass', namespace, 10, repeat=3)
+            print(f'{expired:>8} {label:<8} {construction * 1e3:>11.3f} ms {iteration * 1e3:>11.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
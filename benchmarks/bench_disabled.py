@@ -0,0 +1,54 @@
+"""Benchmark the overhead of wrapped dicts with all deprecation checks turned off.
+
+The checks are turned off through the environment variable ``DKEY_DISABLED``,
+which has to be set before :any:`dkey` is imported. This module sets it itself,
+so run it in a fresh interpreter::
+
+    python -m benchmarks.bench_disabled
+
+"""
+
+import os
+import sys
+
+if 'dkey' in sys.modules:
+    raise RuntimeError('dkey was imported before DKEY_DISABLED could be set.')
+os.environ['DKEY_DISABLED'] = '1'
+
+from dkey import deprecate_keys, dkey  # noqa: E402
+
+from ._timing import compare, print_header  # noqa: E402
+
+
+def main():
+    """Run the benchmarks and print a report."""
+    data = {f'key {i}': i for i in range(1000)}
+    wrapped = deprecate_keys(data, *(dkey(f'old key {i}', f'key {i}') for i in range(50)))
+    plain = dict(wrapped)
+
+    common = {'hit': 'key 999', 'old': 'old key 0'}
+    wrapped, plain = dict(common, d=wrapped), dict(common, d=plain)
+
+    print_header('1000 keys, 50 deprecations, DKEY_DISABLED=1')
+    compare('d[hit]', 'd[hit]', wrapped, plain)
+    compare('d[old]', 'd[old]', wrapped, plain)
+    compare('d.get(hit)', 'd.get(hit)', wrapped, plain)
+    compare('d[hit] = 1', 'd[hit] = 1', wrapped, plain)
+    compare('for k in d', 'for k in d: pass', wrapped, plain, number=1000)
+    compare('len(d)', 'len(d)', wrapped, plain)
+
+    # Aliases still resolve to their new key, which the plain dict reads directly.
+    aliased = deprecate_keys(data, *(dkey(f'old key {i}', f'key {i}') for i in range(50)), alias=True)
+    aliased = dict(common, d=aliased)
+    plain = dict(common, d=dict(data), old='key 0')
+
+    print_header('1000 keys, 50 aliases, DKEY_DISABLED=1')
+    compare('d[hit]', 'd[hit]', aliased, plain)
+    compare('d[old]', 'd[old]', aliased, plain)
+    compare('d.get(hit)', 'd.get(hit)', aliased, plain)
+    compare('d[hit] = 1', 'd[hit] = 1', aliased, plain)
+    compare('for k in d', 'for k in d: pass', aliased, plain, number=1000)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""Benchmark comparing large wrapped configs, e.g. to detect changes on reload."""
+
+import warnings
+
+from dkey import deprecate_keys, deprecation_schema, dkey
+
+from ._timing import compare, print_header
+
+
+def _namespaces(size, deprecations):
+    data = {f'key {i}': i for i in range(size)}
+    schema = deprecation_schema(*(dkey(f'old key {i}', f'key {i}') for i in range(deprecations)))
+    wrapped = deprecate_keys(data, schema)
+    plain = dict(dict.items(wrapped))
+
+    changed = dict(plain, **{f'key {size - 1}': -1})
+    wrapped_namespace = {
+        'd': wrapped, 'same': wrapped.copy(), 'changed': deprecate_keys(changed, schema),
+        'longer': deprecate_keys(dict(data, extra=0), schema),
+    }
+    plain_namespace = {'d': plain, 'same': dict(plain), 'changed': changed, 'longer': dict(plain, extra=0)}
+
+    return wrapped_namespace, plain_namespace
+
+
+def main():
+    """Run the equality benchmarks and print a report."""
+    warnings.simplefilter('ignore')
+
+    for size in (10000, 1000000):
+        number = max(1, 1000000 // size)
+        for deprecations in (0, 100):
+            print_header(f'{size} keys, {deprecations} deprecations')
+            wrapped, plain = _namespaces(size, deprecations)
+            compare('d == d', 'd == d', wrapped, plain, number=number)
+            compare('d == same', 'd == same', wrapped, plain, number=number)
+            compare('d == changed', 'd == changed', wrapped, plain, number=number)
+            compare('d == longer', 'd == longer', wrapped, plain, number=number)
+            compare('d != changed', 'd != changed', wrapped, plain, number=number)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""Benchmark iterating over large wrapped dicts."""
+
+import warnings
+
+from dkey import deprecate_keys, dkey
+
+from ._timing import compare, print_header
+
+
+def _namespaces(size, deprecations):
+    data = {f'key {i}': i for i in range(size)}
+    step = size // deprecations if deprecations else 1
+    mappings = [dkey(f'key {i}') for i in range(0, size, step)[:deprecations]]
+    wrapped = deprecate_keys(data, *mappings)
+
+    return {'d': wrapped}, {'d': data}
+
+
+def main():
+    """Run the iteration benchmarks and print a report."""
+    warnings.simplefilter('ignore')
+
+    for deprecations in (0, 10):
+        print_header(f'100000 keys, {deprecations} deprecations')
+        wrapped, plain = _namespaces(100000, deprecations)
+        compare('list(d)', 'list(d)', wrapped, plain, number=20)
+        compare('for k in d', 'for k in d: pass', wrapped, plain, number=20)
+        compare('list(d.values())', 'list(d.values())', wrapped, plain, number=20)
+        compare('list(d.items())', 'list(d.items())', wrapped, plain, number=20)
+        compare('dict(d)', 'dict(d)', wrapped, plain, number=5)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""Benchmark loading JSON configs with deprecated keys in nested objects."""
+
+import json
+
+from dkey import deprecate_keys, deprecation_schema, dkey, loads_json
+
+from ._timing import best_of
+
+
+def _document(sections, entries):
+    """Return a JSON config with `sections` sections of `entries` objects each."""
+    return json.dumps({
+        **{f'section {i}': {f'entry {j}': {'value': j, 'tags': ['a', 'b'], 'text': 'x' * 20} for j in range(entries)}
+           for i in range(sections)},
+        **{f'top {i}': i for i in range(1000)},
+    })
+
+
+def main():
+    """Print the time taken to load a JSON config by different means, relative to plain json.loads."""
+    root = deprecation_schema(dkey('old top 0', 'top 0'))
+    paths = {('section 0',): [dkey('old entry 0', 'entry 0')], (..., ...): [dkey('val', 'value')]}
+
+    def object_pairs_hook(pairs):
+        return deprecate_keys(dict(pairs))
+
+    print(f'{"size":>8} {"json.loads":>12} {"then wrap root":>15} {"pairs hook":>12} {"loads_json":>12} '
+          f'{"with paths":>12}')
+    for sections, entries in ((10, 100), (100, 100)):
+        document = _document(sections, entries)
+        namespace = {'json': json, 'document': document, 'deprecate_keys': deprecate_keys, 'root': root,
+                     'paths': paths, 'loads_json': loads_json, 'object_pairs_hook': object_pairs_hook}
+        times = [best_of(stmt, namespace, 3, repeat=3) for stmt in (
+            'json.loads(document)',
+            'deprecate_keys(json.loads(document), root)',
+            'json.loads(document, object_pairs_hook=object_pairs_hook)',
+            'loads_json(document, root)',
+            'loads_json(document, root, paths=paths)',
+        )]
+        ratios = [time / times[0] for time in times]
+        print(f'{len(document) / 1e6:>6.2f}MB {ratios[0]:>11.2f}x {ratios[1]:>14.2f}x {ratios[2]:>11.2f}x '
+              f'{ratios[3]:>11.2f}x {ratios[4]:>11.2f}x')
+
+
+if __name__ == '__main__':
+    main()
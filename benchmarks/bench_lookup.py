@@ -0,0 +1,56 @@
+"""Benchmark single item lookups of non-deprecated and deprecated keys."""
+
+import warnings
+
+from dkey import collect_deprecations, deprecate_keys, dkey, frozen_deprecate_keys, set_emission_policy
+
+from ._timing import compare, print_header
+
+
+def _namespaces(size, deprecations):
+    data = {f'key {i}': i for i in range(size)}
+    mappings = [dkey(f'old key {i}', f'key {i}') for i in range(deprecations)]
+    wrapped = deprecate_keys(data, *mappings)
+    plain = dict(wrapped)
+
+    common = {'hit': f'key {size - 1}', 'old': 'old key 0', 'miss': 'no key'}
+    return dict(common, d=wrapped), dict(common, d=plain)
+
+
+def main():
+    """Run the lookup benchmarks and print a report."""
+    warnings.simplefilter('ignore')
+
+    for deprecations in (0, 1, 50):
+        print_header(f'1000 keys, {deprecations} deprecations')
+        wrapped, plain = _namespaces(1000, deprecations)
+        compare('d[hit]', 'd[hit]', wrapped, plain)
+        compare('d.get(hit)', 'd.get(hit)', wrapped, plain)
+        compare('d.get(miss)', 'd.get(miss)', wrapped, plain)
+        compare('hit in d', 'hit in d', wrapped, plain)
+        compare('miss in d', 'miss in d', wrapped, plain)
+        if deprecations:
+            compare('d[old] (deprecated)', 'd[old]', wrapped, plain, number=10000)
+
+    print_header('1000 keys, 1 deprecation, deprecated lookups per emission policy')
+    wrapped, plain = _namespaces(1000, 1)
+    for policy in ('always', 'once per key', 'once per call site', 'once per process'):
+        set_emission_policy(policy)
+        compare(f'd[old] ({policy})', 'd[old]', wrapped, plain, number=10000)
+    set_emission_policy('always')
+
+    print_header('1000 keys, 1 deprecation, frozen dict')
+    frozen = dict(wrapped, d=frozen_deprecate_keys(dict(dict.items(wrapped['d'])), dkey('old key 0', 'key 0')))
+    compare('d[hit]', 'd[hit]', frozen, plain)
+    compare('hash(d)', 'hash(d)', frozen, dict(plain, d=frozenset(plain['d'].items())))
+
+    print_header('1000 keys, 1 deprecation, deprecated lookups recorded by collect_deprecations')
+    with collect_deprecations() as hits:
+        compare('d[old] (recorded)', 'd[old]', wrapped, plain, number=10000)
+    hits.clear()
+    with collect_deprecations(warn=False) as hits:
+        compare('d[old] (recorded, warn=False)', 'd[old]', wrapped, plain, number=10000)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Compare the memory taken by duplicated and aliased replaced keys."""
+
+import tracemalloc
+
+from dkey import deprecate_keys, dkey
+
+
+def allocated(factory):
+    """
+    Return the number of bytes still allocated by the object `factory` returns.
+
+    Parameters
+    ----------
+    factory : callable
+        Function taking no arguments whose result is measured
+
+    Returns
+    -------
+    int
+        Number of bytes allocated while calling `factory` that are still alive.
+
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = factory()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    del result
+    return after - before
+
+
+def main(size=100000, renamed_fraction=0.1):
+    """Print the memory taken by a plain dict and both wrapping modes."""
+    data = {f'key {i}': i for i in range(size)}
+    mappings = [dkey(f'old key {i}', f'key {i}') for i in range(int(size * renamed_fraction))]
+
+    print(f'{size} keys, {len(mappings)} renamed')
+    print(f'{"":<30} {"entries":>10} {"memory":>18}')
+    plain = allocated(lambda: dict(data))
+    print(f'{"dict":<30} {size:>10} {plain:>12} bytes')
+    for label, alias in (('deprecate_keys', False), ('deprecate_keys(alias=True)', True)):
+        memory = allocated(lambda: deprecate_keys(data, *mappings, alias=alias))
+        entries = dict.__len__(deprecate_keys(data, *mappings, alias=alias))
+        print(f'{label:<30} {entries:>10} {memory:>12} bytes {memory / plain:>6.2f}x')
+
+
+if __name__ == '__main__':
+    main()
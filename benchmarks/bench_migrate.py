@@ -0,0 +1,52 @@
+"""Benchmark the throughput of migrating records in records per second."""
+
+import json
+import os
+import time
+
+from dkey import dkey, migrate, migrate_jsonl
+
+
+def _records(number, share):
+    """Return `number` records, of which every `share`-th one contains deprecated keys."""
+    records = []
+    for i in range(number):
+        record = {'id': i, 'last name': 'Smith', 'email': 'smith@example.com', 'tags': ['a', 'b'], 'age': i % 90}
+        if i % share == 0:
+            record['name'] = record.pop('last name')
+            record['fax'] = '0123'
+        records.append(record)
+
+    return records
+
+
+def _rate(function, number):
+    """Return the records per second when `function` processes `number` records."""
+    start = time.perf_counter()
+    function()
+    return number / (time.perf_counter() - start)
+
+
+def main():
+    """Print the records per second migrated by the different ways of migrating."""
+    deprecations = (dkey('name', 'last name'), dkey('fax'), dkey('mail', 'email'))
+    number = 200000
+    processes = os.cpu_count() or 1
+
+    print(f'{"records with old keys":<22} {"migrate":>14} {"migrate_jsonl":>14} {"parallel":>14} {"json round trip":>16}')
+    for share in (1, 10, 1000):
+        records = _records(number, share)
+        lines = [json.dumps(record) + '\n' for record in records]
+
+        in_memory = _rate(lambda: list(migrate(records, *deprecations)), number)
+        serial = _rate(lambda: list(migrate_jsonl(lines, *deprecations)), number)
+        parallel = _rate(lambda: list(migrate_jsonl(lines, *deprecations, processes=processes)), number)
+        baseline = _rate(lambda: [json.dumps(json.loads(line)) + '\n' for line in lines], number)
+        print(f'{f"1 in {share}":<22} {in_memory / 1e3:>10.0f} k/s {serial / 1e3:>10.0f} k/s '
+              f'{parallel / 1e3:>10.0f} k/s {baseline / 1e3:>12.0f} k/s')
+
+    print(f'\nparallel: {processes} processes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Compare wrapping every nested dict of a config eagerly with deprecating keys by path."""
+
+import tracemalloc
+import warnings
+
+from dkey import deprecate_keys, deprecation_schema, dkey
+
+from ._timing import best_of
+
+_no_deprecations = deprecation_schema()
+
+
+def _config(sections, entries):
+    """Return a config with `sections` sections of `entries` nested dicts each."""
+    return {f'section {i}': {f'entry {j}': {'value': j, 'limits': {'low': 0, 'high': j}} for j in range(entries)}
+            for i in range(sections)}
+
+
+def _wrap_all(node, schemas):
+    """Wrap every nested dict of `node`, with the schema of its key or without deprecated keys."""
+    if not isinstance(node, dict):
+        return node
+
+    wrapped = {key: _wrap_all(value, schemas) for key, value in node.items()}
+    return deprecate_keys(wrapped, schemas.get(id(node), _no_deprecations))
+
+
+def _allocated(factory):
+    """Return the number of bytes still allocated by the object `factory` returns."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = factory()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    del result
+    return after - before
+
+
+def main():
+    """Print the time and memory taken to wrap a nested config and to read a deprecated nested key."""
+    warnings.simplefilter('ignore')
+    schema = deprecation_schema(dkey('max', 'high', path=('section 0', 'entry 0', 'limits')))
+
+    print(f'{"size":>14} {"":<10} {"construction":>14} {"and read":>12} {"memory":>12}')
+    for sections, entries in ((10, 100), (100, 100)):
+        config = _config(sections, entries)
+        limits = config['section 0']['entry 0']['limits']
+        eager_schemas = {id(limits): deprecation_schema(dkey('max', 'high'))}
+
+        namespace = {'deprecate_keys': deprecate_keys, '_wrap_all': _wrap_all, 'config': config,
+                     'schema': schema, 'eager_schemas': eager_schemas}
+        for label, stmt in (('eager', '_wrap_all(config, eager_schemas)'), ('by path', 'deprecate_keys(config, schema)')):
+            construction = best_of(stmt, namespace, 3, repeat=3)
+            # Returning the nested dicts in proxies is part of the read.
+            read = best_of(f'{stmt}["section 0"]["entry 0"]["limits"]["max"]', namespace, 3, repeat=3)
+            memory = _allocated(lambda: eval(stmt, namespace))
+            print(f'{sections * entries:>8} dicts {label:<10} {construction * 1e3:>11.3f} ms {read * 1e3:>9.3f} ms '
+                  f'{memory / 1e3:>9.0f} kB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""Compare size and speed of pickled wrapped dicts with pickled plain dicts."""
+
+import pickle
+
+from dkey import deprecate_keys, deprecation_schema, dkey
+
+from ._timing import best_of
+
+
+def main():
+    """Print pickle sizes and round trip times for schemas with and without a name."""
+    print(f'{"schema":<10} {"size":>8} {"deprecated":>10} {"dkey":>10} {"dict":>10} {"ratio":>7} {"round trip":>12}')
+    for size in (100, 10000):
+        data = {f'key {i}': i for i in range(size)}
+        for deprecations in (10, 100):
+            # Distinct details per size, so the unnamed schemas do not match a named one built before.
+            mappings = [dkey(f'old key {i}', f'key {i}', details=f'{size}') for i in range(deprecations)]
+            for name in (None, f'bench {size} {deprecations}'):
+                wrapped = deprecate_keys(data, deprecation_schema(*mappings, name=name))
+                dkey_size = len(pickle.dumps(wrapped))
+                dict_size = len(pickle.dumps(data))
+                number = max(1, 10000 // size)
+                dkey_time = best_of('pickle.loads(pickle.dumps(d))', {'pickle': pickle, 'd': wrapped}, number)
+                dict_time = best_of('pickle.loads(pickle.dumps(d))', {'pickle': pickle, 'd': data}, number)
+                print(f'{"named" if name else "unnamed":<10} {size:>8} {deprecations:>10} {dkey_size:>8} B '
+                      f'{dict_size:>8} B {dkey_size / dict_size:>6.2f}x {dkey_time / dict_time:>11.2f}x')
+
+
+if __name__ == '__main__':
+    main()
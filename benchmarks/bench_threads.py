@@ -0,0 +1,74 @@
+"""Benchmark the throughput of a wrapped dict shared by several threads.
+
+On CPython builds with the global interpreter lock, threads only share a single
+core, so the throughput does not grow with the number of threads. Free-threaded
+builds (``python3.13t`` and later) show how well the read path scales.
+"""
+
+import sys
+import threading
+import time
+import warnings
+
+from dkey import deprecate_keys, dkey
+
+
+def _throughput(target, threads, operations):
+    """Return the operations per second of `threads` threads each calling `target` `operations` times."""
+    barrier = threading.Barrier(threads + 1)
+
+    def run():
+        barrier.wait()
+        target(operations)
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+
+    return threads * operations / (time.perf_counter() - start)
+
+
+def _reader(d, keys):
+    def read(operations):
+        for i in range(operations):
+            d[keys[i % len(keys)]]
+
+    return read
+
+
+def _writer(d, keys):
+    def write(operations):
+        for i in range(operations):
+            d[keys[i % len(keys)]] = i
+
+    return write
+
+
+def main():
+    """Print the operations per second of wrapped and plain dicts for increasing numbers of threads."""
+    warnings.simplefilter('ignore')
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f'Python {sys.version.split()[0]}, GIL {"enabled" if gil else "disabled"}')
+
+    data = {f'key {i}': i for i in range(1000)}
+    keys = list(data)
+    operations = 200000
+
+    print(f'{"case":<12} {"threads":>8} {"dkey":>14} {"dict":>14} {"ratio":>8}')
+    for case, worker in (('read', _reader), ('write', _writer)):
+        for threads in (1, 2, 4, 8):
+            wrapped = deprecate_keys(data, *(dkey(f'old key {i}', f'key {i}') for i in range(10)), alias=True)
+            plain = dict(data)
+            dkey_ops = _throughput(worker(wrapped, keys), threads, operations // threads)
+            dict_ops = _throughput(worker(plain, keys), threads, operations // threads)
+            print(f'{case:<12} {threads:>8} {dkey_ops / 1e6:>9.2f} M/s {dict_ops / 1e6:>9.2f} M/s '
+                  f'{dict_ops / dkey_ops:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""Benchmark suite tracking the overhead of :any:`dkey.deprecate_keys` compared to :any:`dict`.
+
+Every case is timed once with a wrapped and once with a plain dict of the same
+content for several dict sizes and numbers of deprecated keys. The suite prints
+the ratio between both times and exits with a non-zero status if a ratio exceeds
+its threshold in :any:`THRESHOLDS` for the size of the dict and whether it has
+deprecated keys::
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --sizes 100 10000 --deprecations 0 10 --factor 1.5
+
+"""
+
+import argparse
+import sys
+import warnings
+
+from dkey import deprecate_keys, deprecation_schema, dkey
+
+from ._timing import best_of
+
+# name: (statement for the wrapped dict, statement for the plain dict, needs deprecated keys)
+CASES = {
+    'construction': ('deprecate_keys(data, schema)', 'dict(data)', False),
+    'getitem': ('d[hit]', 'd[hit]', False),
+    'getitem deprecated': ('d[old]', 'd[old]', True),
+    'get': ('d.get(hit)', 'd.get(hit)', False),
+    'get deprecated': ('d.get(old)', 'd.get(old)', True),
+    'contains': ('hit in d', 'hit in d', False),
+    'contains missing': ('miss in d', 'miss in d', False),
+    'iteration': ('for k in d: pass', 'for k in d: pass', False),
+    'len': ('len(d)', 'len(d)', False),
+    'items': ('for k, v in d.items(): pass', 'for k, v in d.items(): pass', False),
+    'copy': ('d.copy()', 'd.copy()', False),
+    'equality': ('d == other', 'd == other', False),
+    'setitem': ('d[hit] = 1', 'd[hit] = 1', False),
+    'pop and setitem': ('d.pop(hit); d[hit] = 1', 'd.pop(hit); d[hit] = 1', False),
+    'update': ('d.update(overlay)', 'd.update(overlay)', False),
+    'merge': ('d | overlay', 'd | overlay', False),
+}
+
+# Maximum tolerated ratio between the time taken with the wrapped and the plain dict, per
+# case and dict size: {size: (limit without deprecated keys, limit with deprecated keys)}.
+# Each limit is the largest ratio measured over eight runs of the default suite plus about
+# 50% headroom, so noise does not fail the suite but real regressions do. Other sizes use
+# the limits of the largest size below them, or of the smallest one.
+THRESHOLDS = {
+    'construction': {100: (7.5, 23), 10000: (2, 2)},
+    'getitem': {100: (3, 7.5), 10000: (3, 9.5)},
+    'getitem deprecated': {100: (None, 150), 10000: (None, 165)},
+    'get': {100: (3.5, 11), 10000: (2.5, 7)},
+    'get deprecated': {100: (None, 110), 10000: (None, 135)},
+    'contains': {100: (3, 9.5), 10000: (3.5, 14)},
+    'contains missing': {100: (3, 12), 10000: (3, 11)},
+    'iteration': {100: (2, 70), 10000: (2.5, 15)},
+    'len': {100: (2, 2), 10000: (2.5, 2)},
+    'items': {100: (2.5, 50), 10000: (2.5, 11)},
+    'copy': {100: (7, 35), 10000: (2, 21)},
+    'equality': {100: (2, 2.5), 10000: (2, 2.5)},
+    'setitem': {100: (3, 15), 10000: (2, 14)},
+    'pop and setitem': {100: (3, 13), 10000: (2.5, 12)},
+    'update': {100: (2, 2.5), 10000: (2.5, 2.5)},
+    'merge': {100: (3, 6), 10000: (2.5, 20)},
+}
+
+
+def threshold(case, size, deprecations):
+    """
+    Return the maximum tolerated ratio of `case` for dicts of `size` items.
+
+    Parameters
+    ----------
+    case : str
+        The name of the case in :any:`CASES`
+    size : int
+        The number of items of the dict
+    deprecations : int
+        The number of deprecated keys of the dict
+
+    Returns
+    -------
+    float
+        The limit of the largest size in :any:`THRESHOLDS` up to `size`, or of the smallest size.
+
+    """
+    limits = THRESHOLDS[case]
+    bucket = max((limit_size for limit_size in limits if limit_size <= size), default=min(limits))
+
+    return limits[bucket][bool(deprecations)]
+
+
+def _namespaces(size, deprecations):
+    data = {f'key {i}': i for i in range(size)}
+    step = max(1, size // deprecations) if deprecations else 1
+    schema = deprecation_schema(*(dkey(f'old key {i}', f'key {i}') for i in range(0, size, step)[:deprecations]))
+    wrapped = deprecate_keys(data, schema)
+    plain = dict(dict.items(wrapped))
+
+    common = {
+        'deprecate_keys': deprecate_keys, 'data': data, 'schema': schema,
+        'hit': f'key {size - 1}', 'old': 'old key 0', 'miss': 'no key',
+        'overlay': {f'key {i}': -i for i in range(min(size, 100))},
+    }
+
+    return dict(common, d=wrapped, other=wrapped.copy()), dict(common, d=plain, other=plain.copy())
+
+
+def run(sizes, deprecation_counts, factor=1.0):
+    """
+    Run all cases and print a report.
+
+    Parameters
+    ----------
+    sizes : iterable of int
+        The numbers of items of the dicts to benchmark
+    deprecation_counts : iterable of int
+        The numbers of deprecated keys to benchmark
+    factor : float, optional
+        Factor applied to all thresholds, e.g. to account for noisy machines
+
+    Returns
+    -------
+    list
+        The `(case, size, deprecations, ratio, threshold)` of all cases exceeding their threshold
+
+    """
+    warnings.simplefilter('ignore')
+    failures = []
+
+    print(f'{"case":<22} {"size":>8} {"deprecated":>10} {"dkey":>12} {"dict":>12} {"ratio":>8} {"limit":>7}')
+    for size in sizes:
+        # Enough executions for measurements of about 10 ms even for small dicts, as shorter ones are noisy.
+        number = max(1, 1000000 // size)
+        for deprecations in deprecation_counts:
+            for case, (dkey_stmt, dict_stmt, needs_deprecations) in CASES.items():
+                if needs_deprecations and not deprecations:
+                    continue
+
+                wrapped, plain = _namespaces(size, deprecations)
+                case_number = number if case in ('construction', 'iteration', 'items', 'copy', 'equality', 'merge') else 10000
+                dkey_time = best_of(dkey_stmt, wrapped, case_number, repeat=7)
+                dict_time = best_of(dict_stmt, plain, case_number, repeat=7)
+
+                ratio = dkey_time / dict_time
+                limit = threshold(case, size, deprecations) * factor
+                marker = '' if ratio <= limit else '  FAILED'
+                print(f'{case:<22} {size:>8} {deprecations:>10} {dkey_time * 1e6:>9.2f} us {dict_time * 1e6:>9.2f} us '
+                      f'{ratio:>7.2f}x {limit:>6.1f}x{marker}')
+                if marker:
+                    failures.append((case, size, deprecations, ratio, limit))
+
+    return failures
+
+
+def main(argv=None):
+    """Run the suite from the command line and return the exit status."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 10000])
+    parser.add_argument('--deprecations', type=int, nargs='+', default=[0, 10])
+    parser.add_argument('--factor', type=float, default=1.0, help='factor applied to all thresholds')
+    args = parser.parse_args(argv)
+
+    failures = run(args.sizes, args.deprecations, args.factor)
+    if failures:
+        print(f'\n{len(failures)} case(s) exceeded their threshold.')
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
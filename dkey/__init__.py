@@ -6,10 +6,46 @@ deprecate_keys
 ==============
 Class to wrap a dict to deprecate some keys in it.
 
+frozen_deprecate_keys
+=====================
+Immutable and hashable variant of deprecate_keys.
+
 dkey
 ====
 Function to generate deprecated keys.
 
+deprecation_schema
+==================
+Class to build a set of deprecated keys once and share it between many dicts.
+
+deprecation_proxy
+=================
+Class to deprecate keys of an existing mapping without copying it.
+
+set_emission_policy
+===================
+Function to set how often the same deprecation warning is emitted.
+
+collect_deprecations
+====================
+Context manager recording the deprecated keys accessed within its block.
+
+load_json
+=========
+Function to read a JSON document with deprecated keys from a file.
+
+loads_json
+==========
+Function to parse a JSON document with deprecated keys.
+
+migrate
+=======
+Function to rename or drop the deprecated keys of stored records.
+
+migrate_jsonl
+=============
+Function to rename or drop the deprecated keys of the records of a JSON lines document.
+
 __version__
 ===========
 A string indicating which version of dkey is currently used.
@@ -20,10 +56,31 @@ A tuple containing the currently used version.
 
 """
 from ._dkey import deprecate_keys as deprecate_keys
+from ._dkey import frozen_deprecate_keys as frozen_deprecate_keys
 from ._dkey import dkey as dkey
+from ._dkey import deprecation_schema as deprecation_schema
+from ._dkey import deprecation_proxy as deprecation_proxy
+from ._dkey import set_emission_policy as set_emission_policy
+from ._dkey import collect_deprecations as collect_deprecations
+from ._json import load_json as load_json
+from ._json import loads_json as loads_json
+from ._migrate import migrate as migrate
+from ._migrate import migrate_jsonl as migrate_jsonl
+
+
+def __getattr__(name):
+    """Determine `__version__` and `version_info` on first access, as importing pbr is slow."""
+    if name not in ('__version__', 'version_info'):
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    from pbr.version import VersionInfo
+
+    _v = VersionInfo('mgen').semantic_version()
+    globals()['__version__'] = _v.release_string()
+    globals()['version_info'] = _v.version_tuple()
+
+    return globals()[name]
 
-from pbr.version import VersionInfo
 
-_v = VersionInfo('mgen').semantic_version()
-__version__ = _v.release_string()
-version_info = _v.version_tuple()
+def __dir__():
+    return sorted([*globals(), '__version__', 'version_info'])
@@ -1,21 +1,249 @@
 """Implementation file of the :any:`dkey` module."""
 
+import os as _os
+from copy import deepcopy as _deepcopy
+from collections import namedtuple as _namedtuple
+from collections.abc import ItemsView as _ItemsView
+from collections.abc import KeysView as _KeysView
+from collections.abc import MutableMapping as _MutableMapping
+from collections.abc import ValuesView as _ValuesView
+from contextvars import ContextVar as _ContextVar
+from functools import lru_cache as _lru_cache
+from itertools import chain as _chain
+from itertools import compress as _compress
+from itertools import count as _count
+from itertools import islice as _islice
+from sys import _getframe
+from threading import Lock as _Lock
+from types import MappingProxyType as _MappingProxyType
 from warnings import warn as _warn
 
 _warning_types = {'developer': DeprecationWarning, 'end user': FutureWarning}
 
 _DEFAULT = object()
 
+# Set the environment variable DKEY_DISABLED to a non-empty value other than 0 to turn off
+# all deprecation checks, e.g. in production. Old keys keep working, but never warn.
+_disabled = _os.environ.get('DKEY_DISABLED', '0') not in ('', '0')
+
+_emission_policies = ('always', 'once per key', 'once per call site', 'once per process')
+_emission = {'policy': 'always', 'cache size': 1024}
+_emitted = {}
+# Only held while the emission cache is changed, checking it needs no lock.
+_emission_lock = _Lock()
+
+# The lists of all active collect_deprecations blocks of the current context and whether
+# to still warn, or None.
+_collectors = _ContextVar('dkey collectors', default=None)
+
+# Schemas created with a name, which pickled dicts refer to instead of their deprecated keys.
+_schemas = {}
+
+# Serializes all changes of the deprecated keys of dicts. The dicts holding the deprecated
+# keys are never changed once assigned, but replaced, so reading them needs no lock.
+_mappings_lock = _Lock()
+
+# Records returned by dkey, so that identical calls share a single record.
+_interned = {}
+_INTERN_LIMIT = 65536
+
+_module_globals = globals()
+_abc_globals = _KeysView.__contains__.__globals__
+
+
+def set_emission_policy(policy='always', cache_size=1024):
+    """
+    Set how often the same deprecation warning is emitted.
+
+    Every access to a deprecated key emits a warning by default, even if the
+    active warning filters would discard it as a duplicate. Emitting a warning
+    is expensive, so in hot loops it can pay off to skip repeated warnings before
+    they reach :any:`warnings.warn`. The warnings that were already emitted are
+    remembered in a cache, which forgets its oldest entries once it holds more
+    than `cache_size` entries. Setting a policy empties the cache.
+
+    Parameters
+    ----------
+    policy : {'always', 'once per key', 'once per call site', 'once per process'}, optional
+        - 'always': Warn on every access of a deprecated key (default).
+        - 'once per key': Warn only once for each deprecated key.
+        - 'once per call site': Warn only once for each deprecated key and line of code
+          accessing it.
+        - 'once per process': Only emit the very first deprecation warning.
+    cache_size : int, optional
+        Maximum number of emitted warnings to remember. Defaults to 1024.
+
+    Raises
+    ------
+    ValueError
+        If an unknown policy or a cache size smaller than 1 is given.
+
+    """
+    if policy not in _emission_policies:
+        raise ValueError(f'Unknown emission policy `{policy}`. Use one of: {", ".join(_emission_policies)}.')
+    if cache_size < 1:
+        raise ValueError(f'The cache size has to be at least 1, not {cache_size}.')
+
+    with _emission_lock:
+        _emission['policy'] = policy
+        _emission['cache size'] = cache_size
+        _emitted.clear()
+
+
+class collect_deprecations:
+    """
+    Context manager recording the deprecated keys accessed within its block.
+
+    Every access of a deprecated key of a :any:`dkey.deprecate_keys` or
+    :any:`dkey.deprecation_proxy` appends the record returned by :any:`dkey.dkey`
+    for this key to the list returned when entering the block::
+
+        with collect_deprecations() as hits:
+            handle(request)
+        used_old_keys = {hit.old_key for hit in hits}
+
+    Unlike :any:`warnings.catch_warnings`, no global state is changed. The records
+    are stored in a :any:`contextvars.ContextVar`, so each thread and each
+    :any:`asyncio` task only records its own accesses. Tasks started within the
+    block record into the same list. The block can also be entered with
+    ``async with``. Nested blocks all record the same accesses.
+
+    Parameters
+    ----------
+    warn : bool, optional
+        Whether accessing a deprecated key still warns within the block. Defaults
+        to `True`. If set to `False`, accesses are only recorded, which is considerably
+        faster.
+
+    """
+
+    __slots__ = ('_warn', '_records', '_token')
+
+    def __init__(self, warn=True):
+        """Construct the context manager, see :any:`dkey.collect_deprecations`."""
+        self._warn = warn
+        self._records = None
+        self._token = None
+
+    def __enter__(self):
+        """Start recording and return the list the records are appended to."""
+        self._records = []
+        active = _collectors.get()
+        lists = (*active[0], self._records) if active else (self._records,)
+        self._token = _collectors.set((lists, self._warn))
+
+        return self._records
+
+    def __exit__(self, *exc_info):
+        """Stop recording."""
+        _collectors.reset(self._token)
+        self._token = None
+
+    async def __aenter__(self):
+        """Start recording and return the list the records are appended to."""
+        return self.__enter__()
+
+    async def __aexit__(self, *exc_info):
+        """Stop recording."""
+        self.__exit__(*exc_info)
+
+
+def _remember_emission(cache_key):
+    """
+    Store the given key in the emission cache, evicting the oldest entry if it is full.
+
+    Returns `False` if another thread stored the key first, else `True`.
+    """
+    with _emission_lock:
+        if cache_key in _emitted:
+            return False
+        if len(_emitted) >= _emission['cache size']:
+            _emitted.pop(next(iter(_emitted)), None)
+        _emitted[cache_key] = True
+
+    return True
+
+
+class _deprecated_key(_namedtuple('_deprecated_key', ('old_key', 'new_key', 'warning_type', 'deprecated_in',
+                                                       'removed_in', 'details', 'message', 'path'))):
+    """
+    Immutable record describing a single deprecated key, as returned by :any:`dkey.dkey`.
+
+    The warning message is only rendered once it is read, see `warning_message`. A
+    `message` other than `None` is used as is instead. `path` holds the keys leading
+    to the nested dict the old key is in, and is empty for keys of the outermost dict.
+
+    For backwards compatibility, the fields can also be read with the keys of the dicts
+    :any:`dkey.dkey` used to return, e.g. ``mapping['old key']``.
+    """
+
+    __slots__ = ()
+
+    _legacy_fields = {'old key': 'old_key', 'new key': 'new_key', 'warning message': 'warning_message',
+                      'warning type': 'warning_type'}
+
+    def __getitem__(self, index):
+        """Return the field at the given position or with the given legacy key, e.g. `'old key'`."""
+        if isinstance(index, str):
+            return getattr(self, self._legacy_fields[index])
+
+        return tuple.__getitem__(self, index)
+
+    @property
+    def warning_message(self):
+        """The message to warn with when the old key is accessed."""
+        if self.message is not None:
+            return self.message
+
+        try:
+            return _format_message(self.old_key, self.new_key, self.deprecated_in, self.removed_in, self.details,
+                                   self.path)
+        except TypeError:
+            # Unhashable versions, details or paths cannot be cached.
+            return _format_message.__wrapped__(self.old_key, self.new_key, self.deprecated_in, self.removed_in,
+                                               self.details, self.path)
+
+    @classmethod
+    def _from_mapping(cls, mapping):
+        """Return the given mapping as record. Accepts records and the dicts returned by former versions of :any:`dkey.dkey`."""
+        if isinstance(mapping, cls):
+            return mapping
+
+        return cls(mapping['old key'], mapping['new key'], mapping['warning type'], None, None, None,
+                   mapping['warning message'], ())
+
+
 class deprecate_keys(dict):
     """Wrapper for dicts that allows to set certain keys as deprecated."""
 
-    def __init__(self, dictionary, *args):
+    __slots__ = ('_key_mappings', '_children', '_alias', '__weakref__')
+
+    def __init__(self, dictionary, *args, alias=False):
         """
         Construct the wrapper class.
 
         Internally, the items are stored in the same order as the given dictionary (CPython >=3.6).
-        The deprecated old keys that were replaced with new ones are positioned
-        just before their respective new keys.
+        The given dictionary is copied in bulk and the deprecated old keys that were replaced
+        with new ones are added after all given items. Old keys that are in the given
+        dictionary keep their position, but are set to the value of their new key.
+
+        If `alias` is set, replaced old keys are not stored at all, even if they
+        are in the given dictionary. Instead they resolve to the item of their
+        new key whenever they are read, written or removed. The wrapped dict then takes up no more space than the given one
+        and both keys always refer to the same value.
+
+        Once no deprecated key is left, the dict switches to a subclass of
+        :any:`deprecate_keys` with the plain dict methods, which is named like it.
+        Check wrapped dicts with ``isinstance(d, deprecate_keys)``, as ``type(d) is
+        deprecate_keys`` fails from then on.
+
+        Keys deprecated with a `path` (see :any:`dkey.dkey`) belong to nested dicts.
+        Those are neither copied nor changed. Reading a nested dict with deprecated keys
+        with `[]`, :any:`deprecate_keys.get` or :any:`deprecate_keys.setdefault` returns
+        it in a :any:`dkey.deprecation_proxy`, so its replaced old keys are aliases of
+        their new keys. All other nested dicts are returned as they are. Every read
+        returns a new proxy, so removed keys of nested dicts keep warning after
+        they were written to.
 
         Parameters
         ----------
@@ -23,35 +251,57 @@ class deprecate_keys(dict):
             The dictionary to wrap
         *args
             Zero or more keys that should show deprecation warnings.
-            Use :any:`dkey.dkey` for each key.
+            Use :any:`dkey.dkey` for each key. Alternatively, a single
+            :any:`dkey.deprecation_schema` can be passed, which is shared
+            with all other dicts using it instead of being rebuilt.
+        alias : bool, optional
+            Whether replaced old keys should be aliases of their new keys
+            instead of separately stored copies. Defaults to `False`.
+
+        Raises
+        ------
+        ValueError
+            If a new key is not in the given dictionary or in the nested dict it belongs
+            to. Nested dicts stored later are not checked.
 
         """
         super().__init__()
-        self._key_mappings = {}
-        _key_mappings_new = {}
-        for mapping in args:
-            self._key_mappings[mapping['old key']] = mapping
-            _key_mappings_new[mapping['new key']] = mapping
-            if not mapping['new key'] in dictionary:
-                raise ValueError(f'The new key `{mapping["new key"]}` which should replace the '
-                                 +f'old key `{mapping["old key"]}` is not in the given dict.')
-
-        for key, value in dictionary.items():
-            try:
-                mapping = _key_mappings_new[key]
-                if not (mapping['old key'] == mapping['new key']):
-                    super().__setitem__(mapping['old key'], value)
-            except KeyError:
-                # Not deprecated.
-                pass
-
-            super().__setitem__(key, value)
+        if not args:
+            schema = _empty_schema
+        elif len(args) == 1 and isinstance(args[0], deprecation_schema):
+            schema = args[0]
+        else:
+            schema = deprecation_schema(*args)
+
+        schema._validate(dictionary.keys())
+        if schema._children:
+            schema._validate_nested(dictionary)
+
+        self._key_mappings = schema._key_mappings
+        self._children = schema._children
+        self._alias = alias
+
+        dict.update(self, dictionary)
+        if alias:
+            self._drop_old_keys(schema)
+        else:
+            self._add_old_keys(schema)
+        if _disabled:
+            # Nothing is checked, only aliases and nested dicts still have to be resolved.
+            self._key_mappings = schema._aliases if alias else {}
+            if schema._children:
+                self._children = _children_by_old_keys(schema._children, schema._key_mappings)
+
+        self._update_class()
 
     def __eq__(self, other):
         """
-        Return `True` if identical to `other`.
+        Return `True` if all items equal the ones of `other`.
 
-        Warns if either this or `other` contains deprecated keys.
+        Compares the stored items, including the old keys stored next to their new
+        keys, just like :any:`dict.__eq__` and without any warnings: comparing does
+        not access single keys. Identical dicts and dicts of different length are
+        recognized without comparing any item.
 
         Parameters
         ----------
@@ -63,29 +313,21 @@ class deprecate_keys(dict):
         bool
             True if they are equal, False otherwise
 
-        Warns
-        -----
-        CustomWarning
-            Warns with the warnings stored for all contained keys.
-
         """
-        for mapping in self._key_mappings.values():
-            deprecate_keys._warn_deprecation(mapping)
-
-        try:
-            for mapping in other._key_mappings.values():
-                deprecate_keys._warn_deprecation(mapping)
-        except AttributeError:
-            pass
-
-        return super().__eq__(other)
+        if self is other:
+            return True
+        if not isinstance(other, dict):
+            return NotImplemented
+        if dict.__len__(self) != dict.__len__(other):
+            return False
 
+        return dict.__eq__(self, other)
 
     def __ne__(self, other):
         """
-        Return `True` if not identical to `other`.
+        Return `True` if any item differs from the ones of `other`.
 
-        Warns if either this or `other` contains deprecated keys.
+        Works the same as :any:`deprecate_keys.__eq__`.
 
         Parameters
         ----------
@@ -97,22 +339,12 @@ class deprecate_keys(dict):
         bool
             True if they are not equal, False otherwise
 
-        Warns
-        -----
-        CustomWarning
-            Warns with the warnings stored for all contained keys.
-
         """
-        for mapping in self._key_mappings.values():
-            deprecate_keys._warn_deprecation(mapping)
-
-        try:
-            for mapping in other._key_mappings.values():
-                deprecate_keys._warn_deprecation(mapping)
-        except AttributeError:
-            pass
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
 
-        return super().__ne__(other)
+        return not equal
 
 
     def __getitem__(self, key):
@@ -143,9 +375,17 @@ class deprecate_keys(dict):
             Warns with the warning stored for the given key if the key is deprecated.
 
         """
-        self._check_deprecated(key)
-
-        return super().__getitem__(key)
+        key_mappings = self._key_mappings
+        if key_mappings:
+            mapping = key_mappings.get(key)
+            if mapping is not None:
+                self._warn_deprecation(mapping)
+                if self._alias:
+                    key = mapping.new_key
+
+        if self._children:
+            return self._descend(key, dict.__getitem__(self, key))
+        return dict.__getitem__(self, key)
 
     def __setitem__(self, key, value):
         """
@@ -167,10 +407,11 @@ class deprecate_keys(dict):
             Further access to the given key will not spawn additional warnings.
 
         """
-        if self._check_deprecated(key):
-            del self._key_mappings[key]
+        key_mappings = self._key_mappings
+        if key_mappings and key in key_mappings:
+            key = self._write_key(key)
 
-        super().__setitem__(key, value)
+        dict.__setitem__(self, key, value)
 
     def __delitem__(self, key):
         """
@@ -219,10 +460,16 @@ class deprecate_keys(dict):
             Warns with the warning stored for the given key if the key is deprecated.
 
         """
-        if self._check_deprecated(key):
-            return True
-        else:
-            return super().__contains__(key)
+        key_mappings = self._key_mappings
+        if key_mappings:
+            mapping = key_mappings.get(key)
+            if mapping is not None:
+                self._warn_deprecation(mapping)
+                if not self._alias:
+                    return True
+                key = mapping.new_key
+
+        return dict.__contains__(self, key)
 
     def __iter__(self):
         """
@@ -242,9 +489,17 @@ class deprecate_keys(dict):
             will warn with its set warning type and message.
 
         """
-        for key in iter(super().keys()):
-            self._check_deprecated(key)
-            yield key
+        keys = dict.keys(self)
+        return _checked_iter(self, keys, keys)
+
+    def __reversed__(self):
+        """
+        Return an iterator over the keys of the dictionary in reverse order.
+
+        Warns for each deprecated item accessed, just as :any:`deprecate_keys.__iter__`.
+        """
+        keys = dict.keys(self)
+        return _checked_iter(self, keys, keys, reverse=True)
 
     def clear(self):
         """
@@ -252,8 +507,13 @@ class deprecate_keys(dict):
 
         Will also remove all deprecation warnings and all keys.
         """
-        self._key_mappings = dict()
-        super().clear()
+        with _mappings_lock:
+            self._key_mappings = {}
+            self._children = {}
+            self._update_class()
+
+        # Outside of the lock, as removing the values may run finalizers using other wrapped dicts.
+        dict.clear(self)
 
     def copy(self):
         """
@@ -262,18 +522,202 @@ class deprecate_keys(dict):
         Will return a wrapped dict that, as the original, will warn
         with the deprecation warnings set for this dict.
 
+        The items are copied without calling :any:`deprecate_keys.__init__`. The
+        deprecated keys are shared with this dict, as neither dict ever changes them
+        in place (see :any:`dkey.deprecation_schema`).
+
         Returns
         -------
         copy : deprecate_keys
-            A shallow copy of the underlying dict and a shallow
-            copy of the underlying deprecation key structure.
+            A shallow copy of the underlying dict sharing the
+            underlying deprecation key structure.
+
+        """
+        return self._copy(deprecate_keys)
+
+    def __copy__(self):
+        """Return a shallow copy of this wrapped dict of the same class, see :any:`deprecate_keys.copy`."""
+        output = self._copy(type(self))
+        if hasattr(self, '__dict__'):
+            output.__dict__.update(self.__dict__)
+
+        return output
+
+    def __deepcopy__(self, memo):
+        """
+        Return a deep copy of this wrapped dict of the same class.
+
+        Keys, values and further attributes are copied with :any:`copy.deepcopy`.
+        The deprecated keys are shared with this dict, just as with :any:`deprecate_keys.copy`.
+        """
+        output = dict.__new__(type(self))
+        memo[id(self)] = output
+        output._key_mappings = self._key_mappings
+        output._children = self._children
+        output._alias = self._alias
+
+        for key, value in dict.items(self):
+            dict.__setitem__(output, _deepcopy(key, memo), _deepcopy(value, memo))
+        if hasattr(self, '__dict__'):
+            output.__dict__.update(_deepcopy(self.__dict__, memo))
+        output._update_class()
+
+        return output
+
+    def __reduce__(self):
+        """
+        Return the data to pickle this dict with.
+
+        Stored old keys whose value is the one of their new key are left out. If the
+        deprecated keys stem from a schema with a name (see :any:`dkey.deprecation_schema`),
+        only the name and the old keys that are no longer deprecated are stored.
+        The schemas of nested dicts are stored along otherwise. Unpickling does not
+        call :any:`deprecate_keys.__init__`.
+        """
+        key_mappings = self._key_mappings
+        children = self._children
+        items = dict(dict.items(self))
+        if not self._alias:
+            for mapping in key_mappings.values():
+                old_key, new_key = mapping.old_key, mapping.new_key
+                if old_key != new_key and old_key in items and new_key in items and items[old_key] is items[new_key]:
+                    del items[old_key]
+
+        args = (_public_classes.get(type(self), type(self)), items, self._alias)
+        for name, schema in _schemas.items():
+            # The nested schemas are only taken from the named schema if they are the same.
+            if children is not schema._children and (children or schema._children):
+                continue
+            if key_mappings is schema._key_mappings or (key_mappings and key_mappings.items() <= schema._key_mappings.items()):
+                args += ((name, tuple(schema._key_mappings.keys() - key_mappings.keys())),)
+                break
+        else:
+            args += (tuple(key_mappings.values()),)
+            if children:
+                args += (children,)
+
+        return _unpickle_deprecate_keys, args, getattr(self, '__dict__', None)
+
+    @classmethod
+    def fromkeys(cls, iterable, value=None):
+        """
+        Return a new wrapped dict with the keys of `iterable` and all values set to `value`.
+
+        The returned dict has no deprecated keys, use :any:`deprecate_keys.deprecate`
+        to add some.
+
+        Parameters
+        ----------
+        iterable
+            The keys of the new dict
+        value : optional
+            The value of all items. Defaults to `None`.
+
+        Returns
+        -------
+        new : deprecate_keys
+            The new dict
+
+        """
+        return cls(dict.fromkeys(iterable, value))
+
+    def deprecate(self, *args):
+        """
+        Deprecate further keys of this dict.
+
+        Works the same as passing the keys to :any:`deprecate_keys.__init__`,
+        but for an already existing dict.
+
+        Parameters
+        ----------
+        *args
+            Zero or more keys that should show deprecation warnings.
+            Use :any:`dkey.dkey` for each key. Alternatively, a single
+            :any:`dkey.deprecation_schema` can be passed.
+
+        Raises
+        ------
+        ValueError
+            If a new key is not in this dict.
+
+        """
+        if len(args) == 1 and isinstance(args[0], deprecation_schema):
+            schema = args[0]
+        else:
+            schema = deprecation_schema(*args)
+
+        schema._validate(dict.keys(self))
+        if schema._children:
+            schema._validate_nested(self)
+
+        key_mappings, children = schema._key_mappings, schema._children
+        if _disabled:
+            key_mappings = schema._aliases if self._alias else {}
+            if children:
+                children = _children_by_old_keys(children, schema._key_mappings)
+        if self._alias:
+            self._drop_old_keys(schema)
+        else:
+            self._add_old_keys(schema)
+
+        with _mappings_lock:
+            if not self._key_mappings:
+                self._key_mappings = key_mappings
+            elif key_mappings:
+                self._key_mappings = {**self._key_mappings, **key_mappings}
+
+            if not self._children:
+                self._children = children
+            elif children:
+                self._children = _merge_children(self._children, children)
+
+            self._update_class()
+
+    def __or__(self, other):
+        """
+        Return a copy of this dict updated with the items of `other`.
+
+        The copy keeps the deprecated keys of this dict, see :any:`deprecate_keys.copy`
+        and :any:`deprecate_keys.update`.
+
+        Parameters
+        ----------
+        other : dict
+            The dict whose items are added to the copy
+
+        Returns
+        -------
+        merged : deprecate_keys
+            The updated copy
 
         """
-        output = deprecate_keys(super())
-        output._key_mappings = self._key_mappings.copy()
+        if not isinstance(other, dict):
+            return NotImplemented
+
+        output = self.copy()
+        output.update(other)
 
         return output
 
+    def __ior__(self, other):
+        """
+        Update this dict with the items of `other`, see :any:`deprecate_keys.update`.
+
+        Parameters
+        ----------
+        other : mapping or iterable of key value pairs
+            The items to add
+
+        Returns
+        -------
+        self : deprecate_keys
+            This dict
+
+        """
+        self.update(other)
+
+        return self
+
     def get(self, key, default=None):
         """
         Get the value stored under `key` or `default` if this key doesn't exist.
@@ -296,10 +740,17 @@ class deprecate_keys(dict):
             The value stored for `key` or `default` if `key` is not in the dict.
 
         """
-        try:
-            return self.__getitem__(key)
-        except KeyError:
-            return default
+        key_mappings = self._key_mappings
+        if key_mappings:
+            mapping = key_mappings.get(key)
+            if mapping is not None:
+                self._warn_deprecation(mapping)
+                if self._alias:
+                    key = mapping.new_key
+
+        if self._children and dict.__contains__(self, key):
+            return self._descend(key, dict.__getitem__(self, key))
+        return dict.get(self, key, default)
 
     def pop(self, key, default=_DEFAULT):
         """
@@ -336,13 +787,14 @@ class deprecate_keys(dict):
             information for this key is removed.
 
         """
-        if self._check_deprecated(key):
-            del self._key_mappings[key]
+        key_mappings = self._key_mappings
+        if key_mappings and key in key_mappings:
+            key = self._write_key(key)
 
         if default is _DEFAULT:
-            return super().pop(key)
+            return dict.pop(self, key)
         else:
-            return super().pop(key, default)
+            return dict.pop(self, key, default)
 
     def popitem(self):
         """
@@ -374,106 +826,188 @@ class deprecate_keys(dict):
         """
         item = super().popitem()
 
-        if self._check_deprecated(item[0]):
-            del self._key_mappings[item[0]]
+        if self._key_mappings and self._check_deprecated(item[0]):
+            self._forget(item[0])
 
         return item
 
+    def setdefault(self, key, default=None):
+        """
+        Return the value of `key` if it is in the dict, else insert `key` with the value `default`.
+
+        Warns if the given key is deprecated. As a deprecated key is always in the
+        dict, only its value is read and the key stays deprecated.
+
+        Parameters
+        ----------
+        key
+            The key to look up
+        default : optional
+            The value to insert if `key` is not in the dict. Defaults to `None`.
+
+        Returns
+        -------
+        value
+            The value of `key`
+
+        Warns
+        -----
+        CustomWarning
+            Warns with the warning stored for the given key if the key is deprecated.
+
+        """
+        key_mappings = self._key_mappings
+        if key_mappings:
+            mapping = key_mappings.get(key)
+            if mapping is not None:
+                self._warn_deprecation(mapping)
+                if self._alias:
+                    key = mapping.new_key
+
+        if self._children and dict.__contains__(self, key):
+            return self._descend(key, dict.__getitem__(self, key))
+        return dict.setdefault(self, key, default)
+
+    def update(self, *args, **kwargs):
+        """
+        Update the dict with the items of `other` and the keyword arguments, overwriting existing keys.
+
+        Works the same as :any:`dict.update`. The incoming keys are intersected with
+        the deprecated keys in a single set operation. Each deprecated key among them
+        warns once and is then treated as in :any:`deprecate_keys.__setitem__`. All
+        items are written in bulk afterwards.
+
+        Parameters
+        ----------
+        *args
+            Optionally a single mapping or iterable of key value pairs with the items to add
+        **kwargs
+            Further items to add
+
+        Raises
+        ------
+        TypeError
+            If more than one positional argument is given.
+
+        Warns
+        -----
+        CustomWarning
+            Warns with the warning stored for each given key that is deprecated.
+
+        """
+        key_mappings = self._key_mappings
+        if not key_mappings:
+            dict.update(self, *args, **kwargs)
+            return
+
+        if len(args) > 1:
+            raise TypeError(f'update expected at most 1 argument, got {len(args)}')
+        other = args[0] if args else {}
+        if kwargs or type(other) is not dict:
+            other = dict(other, **kwargs)
+
+        deprecated = key_mappings.keys() & other.keys()
+        if deprecated:
+            other = self._write_keys(other, deprecated)
+
+        dict.update(self, other)
+
     def items(self):
         """
         Return a new view of the dictionary's items: iterator of `(key, value)` pairs.
 
         Works the same as the plain :any:`dict.items` function except that
-        it warns about all deprecated keys contained before returning.
+        iterating over the view warns whenever a deprecated item is returned.
+        Creating the view or taking its length does not warn. The view supports
+        :any:`reversed`, which warns the same way, and has the `mapping` of dict views.
 
         Returns
         -------
-        dict_items
+        ItemsView
             Basically an iterator over `(key, value)` pairs of the dict. For more information
             about dict views see: `dictionary view <https://docs.python.org/3/library/stdtypes.html#dict-views>`_
 
         Warns
         -----
         CustomWarning
-            Warns for each deprecated item in the dictionary before returning.
+            Warns whenever a deprecated item is returned while iterating over the view.
 
         """
-        for mapping in self._key_mappings.values():
-            self._warn_deprecation(mapping)
-
-        return super().items()
+        return _items_view(self)
 
     def values(self):
         """
         Return a new view of the dictionary's values.
 
         Works the same as the plain :any:`dict.values` function except that
-        it warns about all deprecated keys associated with returned values before returning
-        the view.
+        iterating over the view warns whenever a value stored under a deprecated
+        key is returned. Creating the view or taking its length does not warn. The view
+        supports :any:`reversed`, which warns the same way, and has the `mapping` of dict views.
 
         Returns
         -------
-        dict_values
+        ValuesView
             Basically an iterator over the contained values of the dict. For more information
             about dict views see: `dictionary view <https://docs.python.org/3/library/stdtypes.html#dict-views>`_
 
         Warns
         -----
         CustomWarning
-            Warns for each deprecated item in the dictionary before returning.
+            Warns whenever a value of a deprecated key is returned while iterating over the view.
 
         """
-        for mapping in self._key_mappings.values():
-            self._warn_deprecation(mapping)
-
-        return super().values()
+        return _values_view(self)
 
     def keys(self):
         """
         Return a new view of the dictionary's keys.
 
         Works the same as the plain :any:`dict.keys` function except that
-        it warns about all deprecated keys before returning the view.
+        iterating over the view warns whenever a deprecated key is returned.
+        Creating the view or taking its length does not warn. The view supports
+        :any:`reversed`, which warns the same way, and has the `mapping` of dict views.
 
         Returns
         -------
-        dict_keys
+        KeysView
             Basically an iterator over the contained keys of the dict. For more information
             about dict views see: `dictionary view <https://docs.python.org/3/library/stdtypes.html#dict-views>`_
 
         Warns
         -----
         CustomWarning
-            Warns for each deprecated item in the dictionary before returning.
-
-        """
-        for mapping in self._key_mappings.values():
-            self._warn_deprecation(mapping)
-
-        return super().keys()
+            Warns whenever a deprecated key is returned while iterating over the view.
 
-    def __len__(self):
         """
-        Return the number of items in the dict.
-
-        Will raise warnings, if the dict contains deprecated values. One for
-        each deprecated value.
-
-        Returns
-        -------
-        int
-            The number of items in the dict
-
-        Warns
-        -----
-        CustomWarning
-            Warns for each deprecated item in the dictionary before returning.
+        return _keys_view(self)
+
+    def _raw_keys(self):
+        """Return a view of the stored keys that does not check for deprecated keys."""
+        return dict.keys(self)
+
+    def _raw_values(self):
+        """Return a view of the stored values that does not check for deprecated keys."""
+        return dict.values(self)
+
+    def _raw_items(self):
+        """Return a view of the stored items that does not check for deprecated keys."""
+        return dict.items(self)
+
+    def _copy(self, cls):
+        """Return a shallow copy of this dict as an instance of `cls` without calling its `__init__`."""
+        output = dict.__new__(cls)
+        if type(self).__iter__ is dict.__iter__:
+            # Without overridden iteration, dict.update copies the whole table at once.
+            dict.update(output, self)
+        else:
+            dict.update(output, dict.items(self))
 
-        """
-        for mapping in self._key_mappings.values():
-            self._warn_deprecation(mapping)
+        output._key_mappings = self._key_mappings
+        output._children = self._children
+        output._alias = self._alias
+        output._update_class()
 
-        return super().__len__()
+        return output
 
     def _check_deprecated(self, key):
         """
@@ -482,6 +1016,9 @@ class deprecate_keys(dict):
         Warns using the warning type and message stored with the key and returns True.
         Otherwise it returns False and does not warn.
 
+        The lookup uses :any:`dict.get` instead of catching a :any:`KeyError`, so
+        checking a key that is not deprecated does not raise and catch an exception.
+
         Parameters
         ----------
         key
@@ -493,44 +1030,1170 @@ class deprecate_keys(dict):
             Whether the key is deprecated or not
 
         """
-        try:
-            mapping = self._key_mappings[key]
-            self._warn_deprecation(mapping)
-
-            return True
-        except KeyError:
+        mapping = self._key_mappings.get(key)
+        if mapping is None:
             return False
 
-    @staticmethod
-    def _warn_deprecation(mapping):
+        self._warn_deprecation(mapping)
+
+        return True
+
+    def _write_key(self, key):
         """
-        Warn with the given deprecated key mapping.
+        Return the key under which a write or removal of `key` has to be applied.
 
-        Uses the default Python :any:`warnings.warn` function
-        extracting the `'warning message'` and `'warning type'`
-        from the given mapping (dict).
+        Warns if the given key is deprecated. Aliases (see :any:`deprecate_keys.__init__`)
+        resolve to their new key and keep warning. All other deprecated keys are
+        no longer considered deprecated afterwards.
 
         Parameters
         ----------
-        mapping: dict
-            Dict that needs to contain the two keys `'warning message'`,
-            which should be a :any:`str`, and `'warning type'` which needs
-            to be a valid subclass of :any:`Exception`.
+        key
+            The key that is written or removed
 
-        Warns
-        -----
-        CustomWarning
-            Warns with the given message and warning type.
+        Returns
+        -------
+        key
+            The key of the item that is actually written or removed
 
         """
-        _warn(mapping['warning message'], mapping['warning type'])
+        mapping = self._key_mappings.get(key)
+        if mapping is None:
+            return key
 
+        self._warn_deprecation(mapping)
+        if self._alias and mapping.new_key != key:
+            return mapping.new_key
 
-def dkey(*args, deprecated_in=None, removed_in=None, details=None, warning_type='developer'):
-    """
-    Convert a key into a deprecation lookup dict.
+        self._forget(key)
 
-    To use the :any:`dkey.deprecate_keys` function it is easiest to generate
+        return key
+
+    def _write_keys(self, items, deprecated):
+        """
+        Apply :any:`deprecate_keys._write_key` to all deprecated keys of `items` at once.
+
+        Parameters
+        ----------
+        items : dict
+            The items that are about to be written
+        deprecated : set
+            The keys of `items` that are deprecated
+
+        Returns
+        -------
+        items : dict
+            The given items or, if aliases had to be resolved, a new dict with
+            the items stored under the keys they are actually written to
+
+        """
+        key_mappings = self._key_mappings
+        # Warn in the order of the smaller of both dicts, which costs no more than the intersection.
+        ordered = items if len(items) <= len(key_mappings) else key_mappings
+        aliases = {}
+        forgotten = []
+        for key in ordered:
+            if key not in deprecated:
+                continue
+
+            mapping = key_mappings[key]
+            self._warn_deprecation(mapping)
+            if self._alias and mapping.new_key != key:
+                aliases[key] = mapping.new_key
+            else:
+                forgotten.append(key)
+
+        if forgotten:
+            self._forget(*forgotten)
+
+        if aliases:
+            items = {aliases.get(key, key): value for key, value in items.items()}
+
+        return items
+
+    def _forget(self, *keys):
+        """
+        Remove the deprecation of the given keys from this dict only.
+
+        The deprecated keys may be shared with other dicts (see :any:`dkey.deprecation_schema`)
+        and may be read by other threads at the same time. They are therefore never changed,
+        but replaced by a copy without the given keys. Keys that were already removed, e.g.
+        by another thread, are skipped.
+
+        Parameters
+        ----------
+        *keys
+            The deprecated keys which should no longer warn
+
+        """
+        with _mappings_lock:
+            key_mappings = self._key_mappings.copy()
+            for key in keys:
+                key_mappings.pop(key, None)
+
+            self._key_mappings = key_mappings
+            if not key_mappings:
+                self._update_class()
+
+    def _descend(self, key, value):
+        """
+        Return the value of `key`, in a :any:`dkey.deprecation_proxy` if it is a plain nested dict with deprecated keys.
+
+        The proxy refers to the nested dict instead of copying it, so writes through it
+        reach the one dict stored under the new key and its old keys, which is also the
+        one the caller passed in. Nothing is stored, so reading never changes this dict,
+        but the proxy does not remember which removed keys were written either.
+        """
+        if type(value) is not dict:
+            return value
+
+        children = self._children
+        child = children.get(key)
+        if child is None:
+            # Replaced old keys lead to the same nested deprecations as their new key.
+            mapping = self._key_mappings.get(key)
+            child = None if mapping is None else children.get(mapping.new_key)
+            if child is None:
+                return value
+
+        return _nested_proxy(value, child)
+
+    def _add_old_keys(self, schema):
+        """Store the values of the new keys of the given schema under their old keys as well, overwriting given old keys."""
+        for new_key, old_keys in schema._replacements.items():
+            value = dict.__getitem__(self, new_key)
+            for old_key in old_keys:
+                dict.__setitem__(self, old_key, value)
+
+    def _drop_old_keys(self, schema):
+        """Remove the replaced old keys of the given schema, as aliases are never stored, e.g. if they were passed in."""
+        key_mappings = schema._key_mappings
+        for old_key in key_mappings.keys() & dict.keys(self):
+            if key_mappings[old_key].new_key != old_key:
+                dict.__delitem__(self, old_key)
+
+    def _update_class(self):
+        """
+        Switch to the plain dict methods if no deprecated keys are left and back if there are.
+
+        If all checks are turned off, dicts with aliases switch to methods that only resolve
+        them. Only instances of :any:`deprecate_keys` itself are switched, subclasses keep
+        their class.
+        """
+        cls = type(self)
+        if cls is not deprecate_keys and cls is not _without_deprecations and cls is not _disabled_deprecate_keys:
+            return
+
+        if not self._key_mappings and not self._children:
+            target = _without_deprecations
+        elif _disabled:
+            target = _disabled_deprecate_keys
+        else:
+            target = deprecate_keys
+        if cls is not target:
+            self.__class__ = target
+
+    @staticmethod
+    def _warn_deprecation(mapping):
+        """
+        Warn with the given deprecated key mapping.
+
+        Uses the default Python :any:`warnings.warn` function
+        with the warning message and warning type stored in the
+        given mapping. The warning is attributed to the
+        first caller outside of this module.
+
+        Depending on the policy set with :any:`dkey.set_emission_policy`, warnings
+        that were already emitted before are skipped without calling
+        :any:`warnings.warn` at all. Within a :any:`dkey.collect_deprecations`
+        block, the mapping is recorded first.
+
+        Parameters
+        ----------
+        mapping: _deprecated_key
+            Record as returned by :any:`dkey.dkey`. Its `warning_message` has to be
+            a :any:`str`, which is only rendered here, and its `warning_type` a valid subclass of :any:`Exception`.
+
+        Warns
+        -----
+        CustomWarning
+            Warns with the given message and warning type.
+
+        """
+        if _disabled:
+            return
+
+        collectors = _collectors.get()
+        if collectors is not None:
+            lists, warn = collectors
+            for records in lists:
+                records.append(mapping)
+            if not warn:
+                return
+
+        policy = _emission['policy']
+        if policy == 'once per process':
+            if _emitted or not _remember_emission(None):
+                return
+        elif policy == 'once per key':
+            # Not the record itself, as its versions and details may be unhashable.
+            key = (mapping.old_key, mapping.new_key, mapping.warning_type, mapping.path)
+            if key in _emitted or not _remember_emission(key):
+                return
+
+        frame = _getframe(0)
+        stacklevel = 1
+        while frame.f_globals is _module_globals or frame.f_globals is _abc_globals:
+            frame = frame.f_back
+            stacklevel += 1
+
+        if policy == 'once per call site':
+            cache_key = (mapping.old_key, mapping.new_key, mapping.warning_type, mapping.path, frame.f_code,
+                         frame.f_lineno)
+            if cache_key in _emitted or not _remember_emission(cache_key):
+                return
+
+        _warn(mapping.warning_message, mapping.warning_type, stacklevel=stacklevel)
+
+
+class _without_deprecations(deprecate_keys):
+    """
+    A :any:`deprecate_keys` without any deprecated keys left.
+
+    Instances of :any:`deprecate_keys` switch to this class as soon as their last
+    deprecated key is gone and back once keys are deprecated again (see
+    :any:`deprecate_keys.deprecate`). All methods that would only check for
+    deprecated keys are replaced by the plain dict methods, so such a dict is
+    as fast as a plain one.
+    """
+
+    __slots__ = ()
+
+    __getitem__ = dict.__getitem__
+    __setitem__ = dict.__setitem__
+    __delitem__ = dict.__delitem__
+    __contains__ = dict.__contains__
+    __iter__ = dict.__iter__
+    __reversed__ = dict.__reversed__
+    __eq__ = dict.__eq__
+    __ne__ = dict.__ne__
+    get = dict.get
+    pop = dict.pop
+    popitem = dict.popitem
+    setdefault = dict.setdefault
+    update = dict.update
+    items = dict.items
+    values = dict.values
+    keys = dict.keys
+
+
+class _disabled_deprecate_keys(deprecate_keys):
+    """
+    A :any:`deprecate_keys` with aliases or nested deprecated keys while all checks are turned off.
+
+    Nothing warns, but replaced old keys still resolve to their new keys and nested dicts
+    with deprecated keys are still returned in proxies, so the dict reads and writes the
+    same items as with the checks turned on. Its deprecated keys only hold the aliases,
+    which takes a single lookup per access. Its nested schemas are also stored under the
+    replaced old keys, so they are found without a lookup in the deprecated keys. As
+    aliases are never stored, all methods that do not take a key are the plain dict methods.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        mapping = self._key_mappings.get(key)
+        if mapping is not None:
+            key = mapping.new_key
+
+        if self._children:
+            return self._descend(key, dict.__getitem__(self, key))
+        return dict.__getitem__(self, key)
+
+    def __setitem__(self, key, value):
+        mapping = self._key_mappings.get(key)
+        dict.__setitem__(self, key if mapping is None else mapping.new_key, value)
+
+    def __delitem__(self, key):
+        mapping = self._key_mappings.get(key)
+        dict.__delitem__(self, key if mapping is None else mapping.new_key)
+
+    def __contains__(self, key):
+        mapping = self._key_mappings.get(key)
+        return dict.__contains__(self, key if mapping is None else mapping.new_key)
+
+    def get(self, key, default=None):
+        mapping = self._key_mappings.get(key)
+        if mapping is not None:
+            key = mapping.new_key
+
+        if self._children and dict.__contains__(self, key):
+            return self._descend(key, dict.__getitem__(self, key))
+        return dict.get(self, key, default)
+
+    def pop(self, key, default=_DEFAULT):
+        mapping = self._key_mappings.get(key)
+        if mapping is not None:
+            key = mapping.new_key
+
+        if default is _DEFAULT:
+            return dict.pop(self, key)
+        else:
+            return dict.pop(self, key, default)
+
+    def setdefault(self, key, default=None):
+        mapping = self._key_mappings.get(key)
+        if mapping is not None:
+            key = mapping.new_key
+
+        if self._children and dict.__contains__(self, key):
+            return self._descend(key, dict.__getitem__(self, key))
+        return dict.setdefault(self, key, default)
+
+    __iter__ = dict.__iter__
+    __reversed__ = dict.__reversed__
+    __eq__ = dict.__eq__
+    __ne__ = dict.__ne__
+    popitem = dict.popitem
+    items = dict.items
+    values = dict.values
+    keys = dict.keys
+
+
+class frozen_deprecate_keys(deprecate_keys):
+    """
+    Immutable and hashable variant of :any:`dkey.deprecate_keys`.
+
+    Reading works the same as for :any:`dkey.deprecate_keys`, including all warnings.
+    All methods that would change the dict raise a :any:`TypeError` instead, so
+    its deprecated keys never change either. The hash is computed from the items
+    on first use and then cached, which makes frozen dicts suitable as keys of
+    :any:`functools.lru_cache` or other mappings, as long as all values are hashable.
+
+    Example::
+
+        settings = frozen_deprecate_keys({'timeout': 10}, dkey('time out', 'timeout'))
+
+    """
+
+    __slots__ = ('_hash',)
+
+    def __init__(self, dictionary, *args, alias=False):
+        """
+        Construct the frozen dict, see :any:`deprecate_keys.__init__`.
+
+        Raises
+        ------
+        TypeError
+            If the dict was constructed before, as that would change it.
+
+        """
+        try:
+            self._key_mappings
+        except AttributeError:
+            super().__init__(dictionary, *args, alias=alias)
+        else:
+            self._raise_immutable()
+
+    def __hash__(self):
+        """Return the hash of the items, which is only computed once."""
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(frozenset(dict.items(self)))
+            return self._hash
+
+    def __or__(self, other):
+        """Return a frozen copy of this dict updated with the items of `other`, see :any:`deprecate_keys.__or__`."""
+        output = deprecate_keys.__or__(self, other)
+        if output is NotImplemented:
+            return output
+
+        return output._copy(frozen_deprecate_keys)
+
+    def __ior__(self, other):
+        """Raise a :any:`TypeError`, as frozen dicts cannot be changed."""
+        self._raise_immutable()
+
+    def __copy__(self):
+        """Return this dict, as it cannot be changed anyway."""
+        return self
+
+    def _raise_immutable(self, *args, **kwargs):
+        """Raise a :any:`TypeError`, as frozen dicts cannot be changed."""
+        raise TypeError('frozen_deprecate_keys objects cannot be changed.')
+
+    __setitem__ = _raise_immutable
+    __delitem__ = _raise_immutable
+    clear = _raise_immutable
+    deprecate = _raise_immutable
+    pop = _raise_immutable
+    popitem = _raise_immutable
+    setdefault = _raise_immutable
+    update = _raise_immutable
+
+    def _update_class(self):
+        """Switch to the plain dict methods for reading if there are no deprecated keys."""
+        if not self._key_mappings and not self._children and type(self) is frozen_deprecate_keys:
+            self.__class__ = _frozen_without_deprecations
+
+
+class _frozen_without_deprecations(frozen_deprecate_keys):
+    """A :any:`frozen_deprecate_keys` without deprecated keys, which reads with the plain dict methods."""
+
+    __slots__ = ()
+
+    __getitem__ = dict.__getitem__
+    __contains__ = dict.__contains__
+    __iter__ = dict.__iter__
+    __reversed__ = dict.__reversed__
+    __eq__ = dict.__eq__
+    __ne__ = dict.__ne__
+    # Defining __eq__ would otherwise remove the hash.
+    __hash__ = frozen_deprecate_keys.__hash__
+    get = dict.get
+    items = dict.items
+    values = dict.values
+    keys = dict.keys
+
+
+# The classes without deprecated keys are an implementation detail and show the name of
+# their public class. Pickles refer to the public class, which switches on unpickling.
+_public_classes = {_without_deprecations: deprecate_keys, _disabled_deprecate_keys: deprecate_keys,
+                   _frozen_without_deprecations: frozen_deprecate_keys}
+for _cls, _public in _public_classes.items():
+    _cls.__name__ = _public.__name__
+    _cls.__qualname__ = _public.__qualname__
+del _cls, _public
+
+
+def _unpickle_deprecate_keys(cls, items, alias, deprecations, children=None):
+    """
+    Rebuild a dict pickled with :any:`deprecate_keys.__reduce__` without calling its `__init__`.
+
+    Parameters
+    ----------
+    cls : type
+        The class of the pickled dict
+    items : dict
+        The stored items
+    alias : bool
+        Whether replaced old keys are aliases
+    deprecations : tuple
+        Either the records of all deprecated keys or the name of the schema and
+        the old keys of the schema that are no longer deprecated
+    children : dict, optional
+        The schemas of the nested dicts, if they are not the ones of the named schema
+
+    Raises
+    ------
+    ValueError
+        If no schema with the stored name was built in this process.
+
+    """
+    if deprecations and isinstance(deprecations[0], _deprecated_key):
+        key_mappings = {mapping.old_key: mapping for mapping in deprecations}
+    elif deprecations:
+        name, forgotten = deprecations
+        try:
+            schema = _schemas[name]
+        except KeyError:
+            raise ValueError(f'No deprecation schema with the name `{name}` was built in this process.') from None
+        key_mappings = schema._key_mappings
+        children = schema._children if children is None else children
+        if forgotten:
+            key_mappings = {old_key: mapping for old_key, mapping in key_mappings.items() if old_key not in forgotten}
+    else:
+        key_mappings = {}
+
+    self = dict.__new__(cls)
+    dict.update(self, items)
+    if not alias:
+        for mapping in key_mappings.values():
+            if mapping.old_key != mapping.new_key and mapping.new_key in items:
+                dict.setdefault(self, mapping.old_key, items[mapping.new_key])
+    children = children or {}
+    if _disabled:
+        if children:
+            children = _children_by_old_keys(children, key_mappings)
+        key_mappings = {old_key: mapping for old_key, mapping in key_mappings.items()
+                        if alias and old_key != mapping.new_key}
+
+    self._key_mappings = key_mappings
+    self._children = children
+    self._alias = alias
+    self._update_class()
+
+    return self
+
+
+class deprecation_schema:
+    """
+    Reusable set of deprecated keys that can be shared by many :any:`dkey.deprecate_keys`.
+
+    Passing the same deprecated keys to every :any:`dkey.deprecate_keys` requires
+    the lookup structures to be rebuilt for every dict. Instead, a schema can be built
+    once and passed to as many dicts as needed. The dicts only copy the schema's
+    deprecations when they modify them, e.g. when a deprecated key is overwritten.
+
+    Example::
+
+        schema = deprecation_schema(dkey('name', 'last name'), dkey('cleartext password'))
+
+        def customer_info():
+            return deprecate_keys({'last name': 'Smith', 'cleartext password': '1234'}, schema)
+
+    Schemas built with a `name` are registered under it. Pickled dicts using such a
+    schema only store its name instead of all their deprecated keys, which keeps
+    pickles sent to other processes small. The unpickling process has to build a schema
+    with the same name before, e.g. at import time of the module defining it.
+
+    Given the `current_version` of the package, keys whose `removed_in` version has
+    been reached are pruned when the schema is built, so dicts using the schema do
+    not spend any time on them::
+
+        schema = deprecation_schema(dkey('fax', removed_in='2.0'), current_version=__version__)
+
+    """
+
+    def __init__(self, *args, name=None, current_version=None, on_expired='drop'):
+        """
+        Build the schema.
+
+        Parameters
+        ----------
+        *args
+            Zero or more keys that should show deprecation warnings.
+            Use :any:`dkey.dkey` for each key. Other schemas can be passed
+            as well, in which case their deprecated keys are added to this one.
+            Keys of nested dicts (see the `path` of :any:`dkey.dkey`) are indexed
+            by their path, so nested dicts are only visited along these paths.
+        name : str, optional
+            Name under which to register the schema for pickling. A schema built
+            later with the same name replaces this one.
+        current_version : str or tuple of int, optional
+            The version of the package using the schema, e.g. ``'2.1.0'``. Keys whose
+            `removed_in` version is at most this version are expired. By default,
+            no key expires. Versions are compared like :pep:`440` versions, so the
+            pre-releases of ``'2.0'``, e.g. ``'2.0rc1'``, come before it. Keys whose
+            `removed_in` is not a version, e.g. ``'next major'``, never expire.
+        on_expired : {'drop', 'raise'}, optional
+            - 'drop': Leave expired keys out of the schema, so they are plain keys
+              again (default).
+            - 'raise': Raise a :any:`ValueError` if any key is expired, e.g. to make
+              sure that tests fail until expired keys are cleaned up.
+
+        Raises
+        ------
+        ValueError
+            If `on_expired` is unknown, `current_version` cannot be compared or
+            `on_expired` is 'raise' and a key is expired.
+
+        """
+        if current_version is not None:
+            args = _live_deprecations(args, current_version, on_expired)
+        self._build(args, 0)
+        self._name = name
+        if name is not None:
+            _schemas[name] = self
+
+    def _build(self, args, depth):
+        """
+        Index the given deprecated keys.
+
+        Keys with a path longer than `depth` belong to nested dicts. They are
+        indexed as a trie, i.e. in a schema per key of this level, which in turn
+        indexes the keys below it.
+
+        Parameters
+        ----------
+        args : tuple
+            The records and schemas passed to :any:`deprecation_schema.__init__`
+        depth : int
+            The length of the path leading to the dicts this schema applies to
+
+        """
+        self._key_mappings = {}
+        nested = {}
+        for mapping in args:
+            if isinstance(mapping, deprecation_schema):
+                self._key_mappings.update(mapping._key_mappings)
+                for key, child in mapping._children.items():
+                    nested.setdefault(key, []).append(child)
+            else:
+                mapping = _deprecated_key._from_mapping(mapping)
+                if len(mapping.path) > depth:
+                    nested.setdefault(mapping.path[depth], []).append(mapping)
+                else:
+                    self._key_mappings[mapping.old_key] = mapping
+
+        self._children = {}
+        for key, items in nested.items():
+            child = deprecation_schema.__new__(deprecation_schema)
+            child._build(items, depth + 1)
+            child._name = None
+            self._children[key] = child
+
+        self._new_keys = frozenset(mapping.new_key for mapping in self._key_mappings.values())
+
+        replacements = {}
+        for mapping in self._key_mappings.values():
+            if mapping.old_key != mapping.new_key:
+                replacements.setdefault(mapping.new_key, []).append(mapping.old_key)
+        self._replacements = {new_key: tuple(old_keys) for new_key, old_keys in replacements.items()}
+        # The deprecated keys that are still needed to resolve aliases if all checks are turned off.
+        self._aliases = {old_key: mapping for old_key, mapping in self._key_mappings.items()
+                         if old_key != mapping.new_key}
+
+    def __len__(self):
+        """Return the number of deprecated keys in this schema, including the ones of nested dicts."""
+        return len(self._key_mappings) + sum(len(child) for child in self._children.values())
+
+    def _validate(self, keys):
+        """
+        Check that all new keys of this schema are in the given keys.
+
+        Parameters
+        ----------
+        keys: KeysView
+            The keys of the dictionary to check
+
+        Raises
+        ------
+        ValueError
+            If a new key is not in the given keys.
+
+        """
+        if not self._new_keys or keys >= self._new_keys:
+            return
+
+        for mapping in self._key_mappings.values():
+            if not mapping.new_key in keys:
+                location = ''.join(f'[{key!r}]' for key in mapping.path)
+                raise ValueError(f'The new key `{mapping.new_key}` which should replace the '
+                                 +f'old key `{mapping.old_key}` is not in the given dict{location}.')
+
+    def _validate_nested(self, dictionary):
+        """
+        Check that all new keys of the nested schemas are in the nested dicts of `dictionary`.
+
+        Only the dicts along the paths of this schema are visited. Paths that do not
+        lead to a dict are skipped.
+
+        Raises
+        ------
+        ValueError
+            If a new key is not in the nested dict it should be in.
+
+        """
+        get = dict.get if isinstance(dictionary, dict) else type(dictionary).get
+        for key, child in self._children.items():
+            value = get(dictionary, key)
+            if isinstance(value, dict):
+                child._validate(dict.keys(value))
+                if child._children:
+                    child._validate_nested(value)
+
+
+_empty_schema = deprecation_schema()
+
+
+def _live_deprecations(args, current_version, on_expired):
+    """
+    Return the records of the given records and schemas whose `removed_in` version is not reached yet.
+
+    Parameters
+    ----------
+    args : tuple
+        The records and schemas passed to :any:`deprecation_schema.__init__`
+    current_version : str or tuple of int
+        The version of the package using the schema
+    on_expired : {'drop', 'raise'}
+        What to do with expired records
+
+    Returns
+    -------
+    list
+        The records that are not expired
+
+    Raises
+    ------
+    ValueError
+        If `on_expired` is unknown, `current_version` cannot be compared or
+        `on_expired` is 'raise' and a record is expired.
+
+    """
+    if on_expired not in ('drop', 'raise'):
+        raise ValueError(f'Unknown value `{on_expired}` for on_expired. Use one of: drop, raise.')
+
+    current = _parse_version(current_version)
+    if current is None:
+        raise ValueError(f'The version `{current_version}` cannot be compared, use a version like `1.2.3`.')
+
+    live = []
+    expired = []
+    for item in args:
+        if isinstance(item, deprecation_schema):
+            mappings = _schema_records(item)
+        else:
+            mappings = (_deprecated_key._from_mapping(item),)
+        for mapping in mappings:
+            removed_in = None if mapping.removed_in is None else _parse_version(mapping.removed_in)
+            # Keys removed in versions that cannot be compared, e.g. 'next major', are kept.
+            if removed_in is not None and removed_in <= current:
+                expired.append(mapping)
+            else:
+                live.append(mapping)
+
+    if expired and on_expired == 'raise':
+        keys = ', '.join(f'`{mapping.old_key}`' for mapping in expired)
+        raise ValueError(f'The keys {keys} should have been removed by version {current_version}.')
+
+    return live
+
+
+def _schema_records(schema):
+    """Yield the records of the given schema and of its nested schemas."""
+    yield from schema._key_mappings.values()
+    for child in schema._children.values():
+        yield from _schema_records(child)
+
+
+def _parse_version(version):
+    """
+    Return a key for comparing the given version, or `None` if it is not a version.
+
+    Versions are compared like :pep:`440` versions: the release numbers first, ignoring
+    trailing zeros, then pre-releases (``a``, ``b``, ``rc``) and development releases
+    before the release and post-releases after it, e.g. ``'2.0.dev1' < '2.0rc1' < '2.0'
+    < '2.0.post1'``. Local version labels (``+...``) are ignored. Ints, floats and
+    tuples of ints are release numbers as well.
+
+    Parameters
+    ----------
+    version : str or int or float or tuple of int
+        The version to parse
+
+    Returns
+    -------
+    tuple or None
+        The key to compare, or `None` for free text like ``'next major'``.
+
+    """
+    if isinstance(version, (int, float)):
+        version = str(version)
+    if not isinstance(version, str):
+        try:
+            release = tuple(version)
+        except TypeError:
+            return None
+        if not release or not all(isinstance(part, int) for part in release):
+            return None
+        pre, post, dev = None, None, None
+    else:
+        # re is only imported when needed, as it takes longer to import than dkey itself.
+        import re
+
+        match = re.fullmatch(r'v?(\d+(?:\.\d+)*)'
+                             r'(?:[-_.]?(a|alpha|b|beta|c|rc|pre|preview)[-_.]?(\d*))?'
+                             r'(?:[-_.]?(post|rev|r)[-_.]?(\d*))?'
+                             r'(?:[-_.]?(dev)[-_.]?(\d*))?'
+                             r'(?:\+[a-z0-9.]*)?', version.strip().lower())
+        if match is None:
+            return None
+        release = tuple(int(part) for part in match.group(1).split('.'))
+        pre_label, pre_number, post_label, post_number, dev_label, dev_number = match.groups()[1:]
+        pre = (_pre_releases[pre_label], int(pre_number or 0)) if pre_label else None
+        post = int(post_number or 0) if post_label else None
+        dev = int(dev_number or 0) if dev_label else None
+
+    while len(release) > 1 and release[-1] == 0:
+        release = release[:-1]
+
+    if pre is None:
+        # Development releases of a release come before its pre-releases, all others come after them.
+        pre = (-1, 0) if dev is not None and post is None else (len(_pre_releases), 0)
+    post = (-1,) if post is None else (post,)
+    dev = (1, 0) if dev is None else (0, dev)
+
+    return release, pre, post, dev
+
+
+_pre_releases = {'a': 0, 'alpha': 0, 'b': 1, 'beta': 1, 'c': 2, 'rc': 2, 'pre': 2, 'preview': 2}
+
+
+def _children_by_old_keys(children, key_mappings):
+    """Return the nested schemas of `children`, also stored under the replaced old keys of their keys."""
+    children = dict(children)
+    for mapping in key_mappings.values():
+        child = children.get(mapping.new_key)
+        if child is not None:
+            children.setdefault(mapping.old_key, child)
+
+    return children
+
+
+def _merge_children(children, others):
+    """Return the nested schemas of `children` and `others` combined, merging the ones of the same key."""
+    merged = dict(children)
+    for key, child in others.items():
+        merged[key] = deprecation_schema(merged[key], child) if key in merged else child
+
+    return merged
+
+class deprecation_proxy(_MutableMapping):
+    """
+    Wrapper that deprecates keys of an existing mapping without copying it.
+
+    In contrast to :any:`dkey.deprecate_keys`, the wrapped mapping is not copied but
+    referenced. All reads and writes go directly to the wrapped mapping, so changes are
+    visible through both the proxy and the mapping itself. Replaced old keys behave as
+    aliases of their new keys (see the `alias` option of :any:`dkey.deprecate_keys`),
+    so the wrapped mapping is never modified by the proxy itself.
+
+    Example::
+
+        config = load_config()  # Loaded once per process
+        proxy = deprecation_proxy(config, dkey('name', 'last name'))
+
+    Nested dicts with deprecated keys (see the `path` of :any:`dkey.dkey`) are
+    returned in proxies of their own when read, so they are not modified either.
+
+    """
+
+    __slots__ = ('_mapping', '_key_mappings', '_children', '_alias', '__weakref__')
+
+    def __init__(self, mapping, *args):
+        """
+        Construct the proxy.
+
+        Parameters
+        ----------
+        mapping: Mapping
+            The mapping to wrap. Has to be a :any:`collections.abc.MutableMapping`
+            to allow changing items through the proxy.
+        *args
+            Zero or more keys that should show deprecation warnings.
+            Use :any:`dkey.dkey` for each key. Alternatively, a single
+            :any:`dkey.deprecation_schema` can be passed.
+
+        Raises
+        ------
+        ValueError
+            If a new key is not in the given mapping.
+
+        """
+        if len(args) == 1 and isinstance(args[0], deprecation_schema):
+            schema = args[0]
+        else:
+            schema = deprecation_schema(*args)
+
+        schema._validate(mapping.keys())
+        if schema._children:
+            schema._validate_nested(mapping)
+
+        self._mapping = mapping
+        self._key_mappings = schema._key_mappings
+        self._children = schema._children
+        self._alias = True
+
+    def __getitem__(self, key):
+        """
+        Get the value of the item of the given key `key`.
+
+        Warns if the given key is deprecated. Replaced old keys return
+        the value of their new key.
+
+        """
+        key_mappings = self._key_mappings
+        if key_mappings:
+            mapping = key_mappings.get(key)
+            if mapping is not None:
+                self._warn_deprecation(mapping)
+                key = mapping.new_key
+
+        if self._children:
+            return self._descend(key, self._mapping[key])
+        return self._mapping[key]
+
+    def __setitem__(self, key, value):
+        """
+        Set the value of the item of the given key `key` to `value`.
+
+        Warns if the given key is deprecated. Replaced old keys set the
+        value of their new key.
+
+        """
+        key_mappings = self._key_mappings
+        if key_mappings and key in key_mappings:
+            key = self._write_key(key)
+
+        self._mapping[key] = value
+
+    def __delitem__(self, key):
+        """
+        Remove the item with key `key` and its associated value.
+
+        Warns if the given key is deprecated. Replaced old keys remove
+        the item of their new key.
+
+        """
+        key_mappings = self._key_mappings
+        if key_mappings and key in key_mappings:
+            key = self._write_key(key)
+
+        del self._mapping[key]
+
+    def __contains__(self, key):
+        """
+        Return `True` if the given key `key` is in the wrapped mapping, else `False`.
+
+        Warns if the given key is deprecated.
+
+        """
+        key_mappings = self._key_mappings
+        if key_mappings:
+            mapping = key_mappings.get(key)
+            if mapping is not None:
+                self._warn_deprecation(mapping)
+                key = mapping.new_key
+
+        return key in self._mapping
+
+    def __iter__(self):
+        """
+        Return an iterator over the keys of the wrapped mapping.
+
+        Warns for each deprecated key returned.
+
+        """
+        return _checked_iter(self, self._mapping.keys(), self._mapping)
+
+    def __len__(self):
+        """Return the number of items in the wrapped mapping without warning."""
+        return len(self._mapping)
+
+    def __eq__(self, other):
+        """Return `True` if the wrapped mapping is equal to `other` without warning."""
+        if isinstance(other, deprecation_proxy):
+            other = other._mapping
+
+        return self._mapping == other
+
+    def __repr__(self):
+        """Return the representation of the proxy."""
+        return f'{type(self).__name__}({self._mapping!r})'
+
+    def get(self, key, default=None):
+        """
+        Get the value stored under `key` or `default` if this key doesn't exist.
+
+        Warns if the given key is deprecated.
+
+        """
+        key_mappings = self._key_mappings
+        if key_mappings:
+            mapping = key_mappings.get(key)
+            if mapping is not None:
+                self._warn_deprecation(mapping)
+                key = mapping.new_key
+
+        if self._children and key in self._mapping:
+            return self._descend(key, self._mapping[key])
+        return self._mapping.get(key, default)
+
+    def keys(self):
+        """Return a view of the keys warning whenever a deprecated key is returned."""
+        return _keys_view(self)
+
+    def values(self):
+        """Return a view of the values warning whenever a value of a deprecated key is returned."""
+        return _values_view(self)
+
+    def items(self):
+        """Return a view of the items warning whenever a deprecated item is returned."""
+        return _items_view(self)
+
+    def _raw_keys(self):
+        """Return a view of the keys of the wrapped mapping that does not check for deprecated keys."""
+        return self._mapping.keys()
+
+    def _raw_values(self):
+        """Return a view of the values of the wrapped mapping that does not check for deprecated keys."""
+        return self._mapping.values()
+
+    def _raw_items(self):
+        """Return a view of the items of the wrapped mapping that does not check for deprecated keys."""
+        return self._mapping.items()
+
+    def _descend(self, key, value):
+        """Return the value of `key`, in a new proxy if it is a plain nested dict with deprecated keys."""
+        child = self._children.get(key)
+        if child is None or type(value) is not dict:
+            return value
+
+        return _nested_proxy(value, child)
+
+    _check_deprecated = deprecate_keys._check_deprecated
+    _write_key = deprecate_keys._write_key
+    _forget = deprecate_keys._forget
+    _update_class = deprecate_keys._update_class
+    _warn_deprecation = staticmethod(deprecate_keys._warn_deprecation)
+
+
+def _nested_proxy(mapping, schema):
+    """
+    Return a :any:`dkey.deprecation_proxy` of the nested dict `mapping` with the deprecated keys of `schema`.
+
+    The new keys are not checked, as they were checked when the outermost dict was
+    wrapped. Reading a nested dict that was replaced since must not raise.
+    """
+    proxy = deprecation_proxy.__new__(deprecation_proxy)
+    proxy._mapping = mapping
+    proxy._key_mappings = schema._key_mappings
+    proxy._children = schema._children
+    proxy._alias = True
+
+    return proxy
+
+
+def _checked_iter(owner, keys, elements, kind='keys', reverse=False):
+    """
+    Return an iterator over `elements` that warns whenever an element of a deprecated key is returned.
+
+    Runs of elements that do not belong to deprecated keys are passed on in bulk by the
+    iterators of :any:`itertools`, so only the elements of deprecated keys are handled in Python.
+    Once the last deprecated key has been passed, the remaining elements are not checked at all.
+    Still, finding the deprecated keys costs a lookup per key up to the last deprecated one.
+
+    Parameters
+    ----------
+    owner : deprecate_keys or deprecation_proxy
+        The object whose deprecated keys are checked
+    keys : iterable
+        A view of the keys of `owner` in the same order as `elements`
+    elements : iterable
+        The elements to return
+    kind : {'keys', 'values', 'items'}, optional
+        What the elements are. The keys of keys and items are taken from the elements
+        themselves, only values need a second pass over `keys`. Defaults to 'keys'.
+    reverse : bool, optional
+        Whether to return the elements in reverse order. Defaults to `False`.
+
+    Returns
+    -------
+    iterator
+        An iterator over `elements`
+
+    """
+    order = reversed if reverse else iter
+    key_mappings = owner._key_mappings
+    if not key_mappings:
+        return order(elements)
+
+    deprecated = len(key_mappings.keys() & keys)
+    if not deprecated:
+        return order(elements)
+
+    positions = _compress(_count(), map(key_mappings.__contains__, order(keys)))
+    value_keys = order(keys) if kind == 'values' else None
+    return _chain.from_iterable(_checked_chunks(owner, positions, order(elements), kind == 'items', value_keys,
+                                                deprecated))
+
+
+def _checked_chunks(owner, positions, elements, items, value_keys, deprecated):
+    """Yield the chunks of `elements` in between deprecated keys and warn right before each deprecated one."""
+    start = 0
+    for position in positions:
+        skipped = position - start
+        yield _islice(elements, skipped)
+        element = next(elements)
+        if value_keys is not None:
+            key = next(_islice(value_keys, skipped, None))
+        else:
+            key = element[0] if items else element
+        if owner._key_mappings:
+            owner._check_deprecated(key)
+        yield (element,)
+
+        start = position + 1
+        deprecated -= 1
+        if not deprecated:
+            break
+
+    yield elements
+
+
+class _view_api:
+    """The parts of the dict views that :any:`collections.abc` views lack."""
+
+    __slots__ = ()
+
+    @property
+    def mapping(self):
+        """A read-only :any:`types.MappingProxyType` of the viewed dict, just as for dict views."""
+        return _MappingProxyType(self._mapping)
+
+    def __repr__(self):
+        return repr(self._raw_view())
+
+
+class _keys_view(_view_api, _KeysView):
+    """View on the keys of a :any:`deprecate_keys` warning only for deprecated keys returned."""
+
+    __slots__ = ()
+
+    def __iter__(self):
+        return iter(self._mapping)
+
+    def __reversed__(self):
+        mapping = self._mapping
+        keys = mapping._raw_keys()
+        return _checked_iter(mapping, keys, keys, reverse=True)
+
+    def _raw_view(self):
+        return self._mapping._raw_keys()
+
+
+class _values_view(_view_api, _ValuesView):
+    """View on the values of a :any:`deprecate_keys` warning only for values of deprecated keys returned."""
+
+    __slots__ = ()
+
+    def __iter__(self):
+        mapping = self._mapping
+        return _checked_iter(mapping, mapping._raw_keys(), mapping._raw_values(), 'values')
+
+    def __reversed__(self):
+        mapping = self._mapping
+        return _checked_iter(mapping, mapping._raw_keys(), mapping._raw_values(), 'values', reverse=True)
+
+    def _raw_view(self):
+        return self._mapping._raw_values()
+
+
+class _items_view(_view_api, _ItemsView):
+    """View on the items of a :any:`deprecate_keys` warning only for deprecated items returned."""
+
+    __slots__ = ()
+
+    def __iter__(self):
+        mapping = self._mapping
+        return _checked_iter(mapping, mapping._raw_keys(), mapping._raw_items(), 'items')
+
+    def __reversed__(self):
+        mapping = self._mapping
+        return _checked_iter(mapping, mapping._raw_keys(), mapping._raw_items(), 'items', reverse=True)
+
+    def _raw_view(self):
+        return self._mapping._raw_items()
+
+
+def dkey(*args, deprecated_in=None, removed_in=None, details=None, warning_type='developer', path=()):
+    """
+    Convert a key into a deprecation lookup record.
+
+    To use the :any:`dkey.deprecate_keys` function it is easiest to generate
     its input with this function. This function generates:
 
     - A key removed deprecation warning object if one key is provided
@@ -561,10 +2224,20 @@ def dkey(*args, deprecated_in=None, removed_in=None, details=None, warning_type=
 
         .. note:: Your custom warning must work with :any:`warnings.warn`
 
+    path : tuple, optional
+        The keys leading to the nested dict the key is deprecated in, e.g.
+        ``dkey('size', 'max size', path=('db', 'pool'))`` for ``config['db']['pool']['size']``.
+        Replaced old keys along the path are not part of it, use their new keys instead.
+        Defaults to the outermost dict.
+
     Returns
     -------
-    dict
-        A dict that can be used as a deprecated key input for :any:`dkey.deprecate_keys`.
+    _deprecated_key
+        An immutable record that can be used as a deprecated key input for :any:`dkey.deprecate_keys`.
+        Its fields `old_key`, `new_key`, `warning_message` and `warning_type` can be read as
+        attributes or, as with the dicts returned by former versions, with the keys `'old key'`,
+        `'new key'`, `'warning message'` and `'warning type'`. The warning message is only
+        rendered once it is read. Identical calls return the same record.
 
     Raises
     ------
@@ -581,28 +2254,54 @@ def dkey(*args, deprecated_in=None, removed_in=None, details=None, warning_type=
 
     if len(args) == 1:
         new_key = old_key
-        replace = False
     else:
         new_key = args[1]
-        replace = True
 
-    message = f'Key `{old_key}` is deprecated'
+    try:
+        warning_type = _warning_types[warning_type]
+    except KeyError:
+        pass
+
+    return _intern(_deprecated_key(old_key, new_key, warning_type, deprecated_in, removed_in, details, None,
+                                   tuple(path)))
+
+
+def _intern(record):
+    """Return the record equal to the given one that was returned before, or remember the given record."""
+    try:
+        known = _interned.get(record)
+    except TypeError:
+        # Unhashable versions or details.
+        return record
+
+    if known is None:
+        if len(_interned) < _INTERN_LIMIT:
+            _interned[record] = record
+        return record
+
+    # Equal fields of different types, e.g. 1 and True or 2 and 2.0, must keep their own record.
+    if any(type(known_field) is not type(field) for known_field, field in zip(known, record)):
+        return record
+
+    return known
+
+
+@_lru_cache(maxsize=1024, typed=True)
+def _format_message(old_key, new_key, deprecated_in, removed_in, details, path):
+    """Return the warning message for the given arguments of :any:`dkey`."""
+    message = f'Key `{old_key}`'
+    if path:
+        message += ' in ' + ''.join(f'[{key!r}]' for key in path)
+    message += ' is deprecated'
     if deprecated_in:
         message += f' since version {deprecated_in}'
     message += '.'
     if removed_in:
         message += f' It will be removed in version {removed_in}.'
     if details is None:
-        if replace:
+        if old_key != new_key:
             details = f'Use `{new_key}` from now on.'
         else:
             details = 'It shouldn\'t be used anymore.'
 
-    message += ' ' + details
-
-    try:
-        warning_type = _warning_types[warning_type]
-    except KeyError:
-        pass
-
-    return {'old key': old_key, 'new key': new_key, 'warning message': message, 'warning type': warning_type}
+    return message + ' ' + details
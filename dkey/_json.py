@@ -0,0 +1,205 @@
+"""Loading JSON documents as :any:`dkey.deprecate_keys`."""
+
+from ._dkey import _deprecated_key, _schema_records
+from ._dkey import deprecate_keys as _deprecate_keys
+from ._dkey import deprecation_schema as _deprecation_schema
+
+
+def loads_json(s, *args, paths=None, alias=False, **kwargs):
+    """
+    Parse a JSON document and deprecate keys of its objects.
+
+    The document is parsed by :any:`json.loads` into plain dicts first, as its C
+    decoder builds them faster than any `object_pairs_hook` could. Afterwards, the
+    outermost object is turned into a :any:`dkey.deprecate_keys` if keys of it or of
+    the objects in it are deprecated.
+
+    Keys of nested objects are best deprecated with the `path` of :any:`dkey.dkey`.
+    Such objects are not copied, but only returned in a :any:`dkey.deprecation_proxy`
+    when they are read (see :any:`dkey.deprecate_keys.__init__`). The same holds for
+    the `paths` that lead from object to object. Only paths containing `...` or lists,
+    and paths overlapping those, wrap all objects they lead to right away, copying each
+    of them with a single bulk update.
+
+    Example::
+
+        config = loads_json(text, dkey('db', 'database'), dkey('host name', 'host', path=('database',)),
+                            paths={('servers', ...): [dkey('timeout')]})
+
+    Parameters
+    ----------
+    s : str, bytes or bytearray
+        The JSON document
+    *args
+        Zero or more keys that should show deprecation warnings in the outermost
+        object. Use :any:`dkey.dkey` for each key. Alternatively, a single
+        :any:`dkey.deprecation_schema` can be passed.
+    paths : dict, optional
+        Deprecated keys of nested objects. Maps the path to the objects, a tuple
+        of keys, to a :any:`dkey.deprecation_schema` or to a list of keys created
+        with :any:`dkey.dkey`. A path element `...` stands for all values of an
+        object. Lists are descended into implicitly, so a path applies to all objects
+        of a list it leads to. Paths that do not exist in the document are skipped.
+    alias : bool, optional
+        Whether replaced old keys should be aliases of their new keys,
+        see :any:`dkey.deprecate_keys.__init__`. Defaults to `False`. Replaced
+        old keys of objects that are only returned in proxies are always aliases.
+    **kwargs
+        Further arguments for :any:`json.loads`
+
+    Returns
+    -------
+    document : deprecate_keys or dict or list or str or int or float or bool or None
+        The parsed document. Objects the deprecations apply to are :any:`dkey.deprecate_keys`,
+        all others are plain dicts.
+
+    Raises
+    ------
+    ValueError
+        If the document is not valid JSON or a new key is not in an object its
+        deprecation applies to.
+
+    """
+    # json is only imported when needed, as it takes longer to import than dkey itself.
+    import json
+
+    return _deprecate_document(json.loads(s, **kwargs), args, paths, alias)
+
+
+def load_json(fp, *args, paths=None, alias=False, **kwargs):
+    """
+    Read a JSON document from a file and deprecate keys of its objects.
+
+    Works the same as :any:`dkey.loads_json` for the contents of `fp`.
+
+    Parameters
+    ----------
+    fp : file-like object
+        The file to read the JSON document from
+    *args
+        Zero or more keys that should show deprecation warnings in the outermost
+        object, see :any:`dkey.loads_json`.
+    paths : dict, optional
+        Deprecated keys of nested objects, see :any:`dkey.loads_json`.
+    alias : bool, optional
+        Whether replaced old keys should be aliases of their new keys. Defaults to `False`.
+    **kwargs
+        Further arguments for :any:`json.loads`
+
+    Returns
+    -------
+    document : deprecate_keys or list or str or int or float or bool or None
+        The parsed document
+
+    """
+    return loads_json(fp.read(), *args, paths=paths, alias=alias, **kwargs)
+
+
+def _deprecate_document(document, args, paths, alias):
+    """Wrap the objects of the parsed `document` the given deprecations apply to."""
+    if len(args) == 1 and isinstance(args[0], _deprecation_schema):
+        root_schema = args[0]
+    else:
+        root_schema = _deprecation_schema(*args)
+
+    schemas = {}
+    lazy = {}
+    for path, deprecations in (paths or {}).items():
+        path = tuple(path)
+        if path and Ellipsis not in path and _leads_to_object(document, path):
+            lazy[path] = _as_schema(deprecations)
+        else:
+            schemas[path] = _as_schema(deprecations)
+
+    # Objects wrapped right away would hide the nested deprecations of overlapping paths.
+    overlapping = True
+    while overlapping:
+        overlapping = [path for path in lazy if any(_overlap(path, other) for other in schemas if other)]
+        for path in overlapping:
+            schemas[path] = lazy.pop(path)
+
+    # The other paths only extend the deprecations of the outermost object.
+    nested = [mapping._replace(path=path + mapping.path) for path, schema in lazy.items()
+              for mapping in _schema_records(schema)]
+    schemas[()] = _deprecation_schema(root_schema, *nested) if nested else root_schema
+
+    # Objects without deprecated keys stay plain dicts instead of being copied.
+    schemas = {path: schema for path, schema in schemas.items() if len(schema)}
+
+    # The deepest objects first, so objects wrapped later contain the wrapped ones.
+    for path in sorted(schemas, key=len, reverse=True):
+        document = _deprecate_path(document, path, schemas[path], alias)
+
+    return document
+
+
+def _leads_to_object(document, path):
+    """Return whether `path` leads from object to object of `document` without passing lists."""
+    node = document
+    for key in path:
+        if type(node) is not dict or key not in node:
+            return False
+        node = dict.__getitem__(node, key)
+
+    return type(node) is dict
+
+
+def _overlap(path, other):
+    """Return whether one of the paths may lead to an object the other one passes or leads to."""
+    return all(key is Ellipsis or other_key is Ellipsis or key == other_key for key, other_key in zip(path, other))
+
+
+def _as_schema(deprecations):
+    """Return the given schema, record or list of records as :any:`dkey.deprecation_schema`."""
+    if isinstance(deprecations, _deprecation_schema):
+        return deprecations
+    if isinstance(deprecations, (_deprecated_key, dict)):
+        return _deprecation_schema(deprecations)
+
+    return _deprecation_schema(*deprecations)
+
+
+def _deprecate_path(node, path, schema, alias):
+    """
+    Wrap the objects at `path` below `node` with the given schema.
+
+    Parameters
+    ----------
+    node
+        A parsed JSON value
+    path : tuple
+        The keys leading from `node` to the objects to wrap
+    schema : deprecation_schema
+        The deprecations to apply
+    alias : bool
+        Whether replaced old keys should be aliases of their new keys
+
+    Returns
+    -------
+    node
+        The given node, or the wrapped one if `path` is empty
+
+    """
+    if isinstance(node, list):
+        for index, item in enumerate(node):
+            node[index] = _deprecate_path(item, path, schema, alias)
+        return node
+
+    if not isinstance(node, dict):
+        return node
+
+    if not path:
+        if isinstance(node, _deprecate_keys):
+            # Reached by another path before, e.g. one containing `...`.
+            node.deprecate(schema)
+            return node
+        return _deprecate_keys(node, schema, alias=alias)
+
+    key, rest = path[0], path[1:]
+    if key is Ellipsis:
+        for child_key, child in list(dict.items(node)):
+            dict.__setitem__(node, child_key, _deprecate_path(child, rest, schema, alias))
+    elif dict.__contains__(node, key):
+        dict.__setitem__(node, key, _deprecate_path(dict.__getitem__(node, key), rest, schema, alias))
+
+    return node
@@ -0,0 +1,192 @@
+"""Rewriting stored records from deprecated keys to their new keys."""
+
+from collections import deque as _deque
+from itertools import islice as _islice
+
+from ._dkey import deprecation_schema as _deprecation_schema
+
+
+def migrate(records, *args):
+    """
+    Rename or drop the deprecated keys of the given records.
+
+    Replaced old keys are renamed to their new keys, keeping their position, and
+    removed keys are dropped. If a record contains both an old key and its new key,
+    the value of the new key is kept. The deprecated keys are compiled into a plan
+    once, and each record is only checked with a single set intersection, so
+    records without deprecated keys are yielded as they are without being copied.
+    Keys deprecated with a `path` (see :any:`dkey.dkey`) are renamed or dropped in
+    the nested records the path leads to.
+
+    Example::
+
+        migrated = list(migrate(records, dkey('name', 'last name'), dkey('fax')))
+
+    Parameters
+    ----------
+    records : iterable of dict
+        The records to migrate. Can be a generator, so records are processed one at a time.
+    *args
+        Zero or more deprecated keys. Use :any:`dkey.dkey` for each key.
+        Alternatively, a single :any:`dkey.deprecation_schema` can be passed.
+
+    Yields
+    ------
+    record : dict
+        Each record with its deprecated keys renamed or dropped. Records that
+        are not dicts are yielded unchanged.
+
+    """
+    plan = _migration_plan(_schema(args))
+    for record in records:
+        yield plan.migrate(record)
+
+
+def migrate_jsonl(lines, *args, processes=None, chunk_size=10000):
+    """
+    Rename or drop the deprecated keys of the records of a JSON lines document.
+
+    Works the same as :any:`dkey.migrate`, but for lines with one JSON record each,
+    e.g. an open file. A line is only parsed if it contains one of the deprecated keys
+    as JSON string, all others are yielded as they are. The migrated lines can be
+    written to another file directly::
+
+        with open('old.jsonl') as source, open('new.jsonl', 'w') as destination:
+            destination.writelines(migrate_jsonl(source, dkey('name', 'last name')))
+
+    Parameters
+    ----------
+    lines : iterable of str
+        The lines to migrate
+    *args
+        Zero or more deprecated keys. Use :any:`dkey.dkey` for each key.
+        Alternatively, a single :any:`dkey.deprecation_schema` can be passed.
+    processes : int, optional
+        Number of worker processes to migrate the lines in parallel with. By default,
+        all lines are migrated in the current process.
+    chunk_size : int, optional
+        Number of lines sent to a worker process at once. Defaults to 10000.
+
+    Yields
+    ------
+    line : str
+        Each line with the deprecated keys of its record renamed or dropped, in the
+        order of `lines`. Rewritten lines end with a newline.
+
+    """
+    plan = _migration_plan(_schema(args))
+    if not processes:
+        for line in lines:
+            yield plan.migrate_line(line)
+        return
+
+    # Imported here, as multiprocessing takes long to import and is rarely needed.
+    from multiprocessing import Pool
+
+    lines = iter(lines)
+    with Pool(processes) as pool:
+        # Only keep a few chunks in flight, so huge files are not read into memory at once.
+        pending = _deque()
+        for chunk in iter(lambda: list(_islice(lines, chunk_size)), []):
+            pending.append(pool.apply_async(plan.migrate_lines, (chunk,)))
+            if len(pending) > 2 * processes:
+                yield from pending.popleft().get()
+
+        while pending:
+            yield from pending.popleft().get()
+
+
+def _schema(args):
+    """Return the schema of the deprecated keys given to :any:`dkey.migrate`."""
+    if len(args) == 1 and isinstance(args[0], _deprecation_schema):
+        return args[0]
+
+    return _deprecation_schema(*args)
+
+
+class _migration_plan:
+    """Renames and removals compiled from a :any:`dkey.deprecation_schema` for :any:`dkey.migrate`."""
+
+    __slots__ = ('_renames', '_removed', '_old_keys', '_children', '_pattern')
+
+    def __init__(self, schema):
+        """
+        Compile the plan.
+
+        Parameters
+        ----------
+        schema : deprecation_schema
+            The deprecated keys to migrate
+
+        """
+        mappings = schema._key_mappings.values()
+        self._renames = {mapping.old_key: mapping.new_key for mapping in mappings if mapping.old_key != mapping.new_key}
+        self._removed = frozenset(mapping.old_key for mapping in mappings if mapping.old_key == mapping.new_key)
+        self._old_keys = frozenset(schema._key_mappings)
+        self._children = {key: _migration_plan(child) for key, child in schema._children.items()}
+
+        # json and re are only imported when needed, as they take longer to import than dkey itself.
+        import json
+        import re
+
+        # Matches the deprecated string keys as they appear in JSON. Other keys cannot appear in JSON.
+        keys = [key for key in self._all_old_keys() if isinstance(key, str)]
+        # Non-ASCII characters may be written as they are or escaped.
+        needles = {json.dumps(key, ensure_ascii=ensure_ascii) for key in keys for ensure_ascii in (True, False)}
+        needles = sorted(needles, key=len, reverse=True)
+        self._pattern = re.compile('|'.join(map(re.escape, needles))) if needles else None
+
+    def migrate(self, record):
+        """Return the given record with its deprecated keys renamed or dropped, see :any:`dkey.migrate`."""
+        if not isinstance(record, dict):
+            return record
+
+        # The dict methods are used, so records wrapped with deprecate_keys do not warn.
+        migrated = record
+        hits = self._old_keys & dict.keys(record)
+        if hits:
+            renames = self._renames
+            dropped = {key for key in hits if key in self._removed or dict.__contains__(record, renames[key])}
+            if len(dropped) == len(hits):
+                migrated = {key: value for key, value in dict.items(record) if key not in dropped}
+            else:
+                migrated = {renames.get(key, key): value for key, value in dict.items(record) if key not in dropped}
+
+        # Nested records are only copied if they contain deprecated keys themselves.
+        for key, plan in self._children.items():
+            value = dict.get(migrated, key)
+            if isinstance(value, dict):
+                value_migrated = plan.migrate(value)
+                if value_migrated is not value:
+                    if migrated is record:
+                        migrated = dict(dict.items(record))
+                    migrated[key] = value_migrated
+
+        return migrated
+
+    def migrate_line(self, line):
+        """Return the given JSON line with its deprecated keys renamed or dropped, see :any:`dkey.migrate_jsonl`."""
+        if self._pattern is None or self._pattern.search(line) is None:
+            return line
+
+        import json
+
+        record = json.loads(line)
+        migrated = self.migrate(record)
+        if migrated is record:
+            # The match was not a key of the record, e.g. a string value.
+            return line
+
+        return json.dumps(migrated, ensure_ascii=False) + '\n'
+
+    def _all_old_keys(self):
+        """Return the old keys of this plan and of the plans of nested records."""
+        keys = set(self._old_keys)
+        for plan in self._children.values():
+            keys |= plan._all_old_keys()
+
+        return keys
+
+    def migrate_lines(self, lines):
+        """Return the given JSON lines migrated with :any:`_migration_plan.migrate_line`."""
+        return [self.migrate_line(line) for line in lines]
@@ -1,10 +1,28 @@
 """Test module testing all features of dkey."""
 
+import asyncio
+import copy
+import functools
+import io
+import json
+import os
+import pickle
+import subprocess
+import sys
+import threading
+import tracemalloc
+import types
 import warnings
 import unittest
 from contextlib import contextmanager
+from itertools import islice
+from unittest import mock
 
-from dkey import deprecate_keys, dkey
+from collections.abc import MutableMapping
+
+from dkey import collect_deprecations, deprecate_keys, deprecation_proxy, deprecation_schema, dkey, set_emission_policy
+from dkey import frozen_deprecate_keys, load_json, loads_json, migrate, migrate_jsonl
+from dkey import _dkey as dkey_module
 
 class version_test_case(unittest.TestCase):
     def test_version_string_available(self):
@@ -12,6 +30,13 @@ class version_test_case(unittest.TestCase):
         self.assertTrue(hasattr(dk, '__version__'))
         self.assertTrue(hasattr(dk, 'version_info'))
 
+    def test_import_does_not_load_version_metadata(self):
+        code = 'import sys, dkey; print(sorted({"pbr", "pkg_resources", "importlib.metadata"} & set(sys.modules)))'
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (root, os.environ.get('PYTHONPATH')))))
+        output = subprocess.run([sys.executable, '-c', code], env=env, check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+        self.assertEqual(output.strip(), '[]')
+
 class dkey_test_case(unittest.TestCase):
     def test_number_of_keys_incorrect(self):
         with self.assertRaises(ValueError):
@@ -20,6 +45,86 @@ class dkey_test_case(unittest.TestCase):
         with self.assertRaises(ValueError):
             dkey('a', 'b', 'c')
 
+    def test_record(self):
+        mapping = dkey('a', 'b', warning_type='end user')
+        self.assertEqual((mapping.old_key, mapping.new_key, mapping.warning_type), ('a', 'b', FutureWarning))
+        self.assertEqual((mapping['old key'], mapping['new key'], mapping['warning type']), ('a', 'b', FutureWarning))
+        self.assertEqual(mapping['warning message'], mapping.warning_message)
+
+        with self.assertRaises(AttributeError):
+            mapping.old_key = 'c'
+
+    def test_message(self):
+        self.assertEqual(dkey('a', 'b', deprecated_in='1.0', removed_in='2.0').warning_message,
+                         'Key `a` is deprecated since version 1.0. It will be removed in version 2.0. '
+                         'Use `b` from now on.')
+        self.assertEqual(dkey('a', details='Gone.').warning_message, 'Key `a` is deprecated. Gone.')
+
+    def test_message_rendered_lazily(self):
+        with mock.patch('dkey._dkey._format_message') as format_message:
+            mapping = dkey('lazy a', 'lazy b')
+            format_message.assert_not_called()
+            my_dict = deprecate_keys({'lazy b': 1}, mapping)
+            format_message.assert_not_called()
+            format_message.return_value = 'Do not use lazy a.'
+            with self.assertWarnsRegex(DeprecationWarning, 'Do not use lazy a.'):
+                my_dict['lazy a']
+            format_message.assert_called_once()
+
+    def test_identical_calls_share_record(self):
+        self.assertIs(dkey('a', 'b', removed_in='2.0'), dkey('a', 'b', removed_in='2.0'))
+        self.assertIsNot(dkey('a', 'b'), dkey('a', 'b', removed_in='2.0'))
+        self.assertIsNot(dkey('a', 'b'), dkey('a', 'b', warning_type='end user'))
+        self.assertIs(dkey(True).old_key, True)
+        self.assertIs(dkey(1).old_key, 1)
+        dkey('x', removed_in=2.0)
+        self.assertIn('version 2.', dkey('x', removed_in=2).warning_message)
+        self.assertIs(type(dkey('x', removed_in=2).removed_in), int)
+
+    def test_unhashable_version(self):
+        mapping = dkey('a', deprecated_in=[1, 0])
+        self.assertIn('since version [1, 0].', mapping.warning_message)
+
+    def test_legacy_dict_accepted(self):
+        mapping = {'old key': 'a', 'new key': 'b', 'warning message': 'Do not use a.', 'warning type': UserWarning}
+        my_dict = deprecate_keys({'b': 12}, mapping)
+        with self.assertWarnsRegex(UserWarning, 'Do not use a.'):
+            self.assertEqual(my_dict['a'], 12)
+
+
+class footprint_test_case(unittest.TestCase):
+    @staticmethod
+    def footprint(factory, number=1000):
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            objects = [factory(i) for i in range(number)]
+            after = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+
+        del objects
+        return (after - before) / number
+
+    def test_mapping_footprint(self):
+        keys = [f'footprint key {i}' for i in range(1000)]
+        record = self.footprint(lambda i: dkey(keys[i]))
+        legacy = self.footprint(lambda i: {'old key': keys[i], 'new key': keys[i],
+                                           'warning message': f'Key `{keys[i]}` is deprecated. It shouldn\'t be used anymore.',
+                                           'warning type': DeprecationWarning})
+        self.assertLess(record, 0.6 * legacy)
+
+    def test_instance_footprint(self):
+        class legacy_deprecate_keys(dict):
+            def __init__(self):
+                self._key_mappings = {}
+                self._shared_mappings = True
+                self._alias = False
+
+        empty = {}
+        self.assertFalse(hasattr(deprecate_keys(empty), '__dict__'))
+        self.assertLess(self.footprint(lambda i: deprecate_keys(empty)), 0.5 * self.footprint(lambda i: legacy_deprecate_keys()))
+
 class deprecate_keys_test_case(unittest.TestCase):
     @contextmanager
     def assertNotWarns(self, warning):
@@ -50,6 +155,16 @@ class deprecate_keys_test_case(unittest.TestCase):
         for key, val in self.example_case['items']:
             self.deprecated_dict[key] = val
 
+    def test_item_order(self):
+        my_dict = deprecate_keys({'c': 13, 'a': 12}, dkey('b', 'c'))
+        self.assertEqual(list(dict.keys(my_dict)), ['c', 'a', 'b'])
+
+    def test_old_key_given(self):
+        my_dict = deprecate_keys({'b': 12, 'c': 13}, dkey('b', 'c'))
+        self.assertEqual(list(dict.keys(my_dict)), ['b', 'c'])
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(my_dict['b'], 13)
+
     def test_wrong_new_key(self):
         with self.assertRaises(ValueError):
             deprecate_keys({'a': 12}, dkey('b', 'c'))
@@ -99,11 +214,13 @@ class deprecate_keys_test_case(unittest.TestCase):
             while self.deprecated_dict:
                 l = len(w)
                 dep_item = self.deprecated_dict.popitem()
-                self.assertEqual(dep_item, self.regular_dict.popitem())
+                self.assertEqual(dep_item[1], self.regular_dict.pop(dep_item[0]))
                 if self.is_deprecated(dep_item[0]):
                     self.assertEqual(len(w), l + 1)
                     num_deprecations = num_deprecations + 1
 
+        self.assertEqual(len(self.regular_dict), 0)
+
         with self.assertNotWarns(DeprecationWarning):
                 self._refill_dict()
 
@@ -142,10 +259,72 @@ class deprecate_keys_test_case(unittest.TestCase):
                     self.assertEqual(len(w), num_deprecations + 1)
                     num_deprecations = len(w)
 
+    def test_iter_order(self):
+        my_dict = deprecate_keys({f'key {i}': i for i in range(100)}, dkey('key 10'), dkey('key 50'), dkey('key 99'))
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            iterator = iter(my_dict)
+            self.assertEqual(list(islice(iterator, 10)), [f'key {i}' for i in range(10)])
+            self.assertEqual(len(w), 0)
+            self.assertEqual(next(iterator), 'key 10')
+            self.assertEqual(len(w), 1)
+            self.assertEqual(list(iterator), [f'key {i}' for i in range(11, 100)])
+            self.assertEqual(len(w), 3)
+
+            self.assertEqual(list(my_dict.values()), list(range(100)))
+            self.assertEqual(list(my_dict.items()), [(f'key {i}', i) for i in range(100)])
+            self.assertEqual(len(w), 9)
+
     def test_copy(self):
         dict_copy = self.deprecated_dict.copy()
         self._test_in(dict_copy)
 
+    def test_copy_shares_deprecations(self):
+        dict_copy = self.deprecated_dict.copy()
+        self.assertIs(dict_copy._key_mappings, self.deprecated_dict._key_mappings)
+
+        with self.assertWarns(DeprecationWarning):
+            dict_copy['a'] = 1
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(self.deprecated_dict['a'], 12)
+
+    def test_copy_module(self):
+        shallow = copy.copy(self.deprecated_dict)
+        self.assertIs(type(shallow), type(self.deprecated_dict))
+        self.assertEqual(dict(dict.items(shallow)), dict(dict.items(self.deprecated_dict)))
+        with self.assertWarns(DeprecationWarning):
+            shallow['a']
+
+    def test_deepcopy(self):
+        value = [1, 2]
+        my_dict = deprecate_keys({'a': value, 'c': {'nested': deprecate_keys({'e': 1}, dkey('d', 'e'))}},
+                                 dkey('b', 'c'), dkey('a'))
+        deep = copy.deepcopy(my_dict)
+
+        self.assertIs(type(deep), deprecate_keys)
+        self.assertIs(deep._key_mappings, my_dict._key_mappings)
+        self.assertIsNot(dict.__getitem__(deep, 'a'), value)
+        self.assertEqual(dict.__getitem__(deep, 'a'), value)
+        self.assertIs(dict.__getitem__(deep, 'b'), dict.__getitem__(deep, 'c'))
+
+        nested = dict.__getitem__(deep, 'c')['nested']
+        self.assertIsInstance(nested, deprecate_keys)
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(nested['d'], 1)
+
+    def test_copy_subclass_attributes(self):
+        class my_deprecate_keys(deprecate_keys):
+            pass
+
+        my_dict = my_deprecate_keys({'a': 12}, dkey('a'))
+        my_dict.note = ['kept']
+        self.assertIs(type(my_dict.copy()), deprecate_keys)
+        self.assertIs(copy.copy(my_dict).note, my_dict.note)
+        deep = copy.deepcopy(my_dict)
+        self.assertIs(type(deep), my_deprecate_keys)
+        self.assertEqual(deep.note, ['kept'])
+        self.assertIsNot(deep.note, my_dict.note)
+
     def test_get(self):
         for key, assertion in self.get_key_assertions():
             with assertion(DeprecationWarning):
@@ -183,6 +362,71 @@ class deprecate_keys_test_case(unittest.TestCase):
             with self.assertNotWarns(DeprecationWarning):
                 self.deprecated_dict[key] = self.example_case['default value']
 
+    def test_update(self):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            self.deprecated_dict.update({'a': 1, 'c': 2, 'e': 3}, b=4)
+            self.assertEqual([str(warning.message)[:7] for warning in w], ['Key `a`', 'Key `b`'])
+
+        self.regular_dict.update({'a': 1, 'c': 2, 'e': 3}, b=4)
+        self.assertEqual(dict(dict.items(self.deprecated_dict)), self.regular_dict)
+        self.assertEqual(self.deprecated_dict._key_mappings, {})
+
+        with self.assertRaises(TypeError):
+            self.deprecated_dict.update({}, {})
+
+    def test_update_pairs(self):
+        with self.assertWarns(DeprecationWarning):
+            self.deprecated_dict.update([('b', 1), ('e', 2)])
+        self.assertEqual(self.deprecated_dict['b'], 1)
+        self.assertEqual(self.deprecated_dict['e'], 2)
+
+    def test_update_shared_schema(self):
+        schema = deprecation_schema(dkey('a'))
+        first = deprecate_keys({'a': 1}, schema)
+        second = deprecate_keys({'a': 2}, schema)
+        with self.assertWarns(DeprecationWarning):
+            first.update(a=3)
+        with self.assertWarns(DeprecationWarning):
+            second['a']
+
+    def test_setdefault(self):
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(self.deprecated_dict.setdefault('b', 100), 13)
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(self.deprecated_dict['b'], 13)
+
+        with self.assertNotWarns(DeprecationWarning):
+            self.assertEqual(self.deprecated_dict.setdefault('e', 100), 100)
+        self.assertEqual(self.deprecated_dict['e'], 100)
+
+    def test_fromkeys(self):
+        my_dict = deprecate_keys.fromkeys(['a', 'b'], 1)
+        self.assertIsInstance(my_dict, deprecate_keys)
+        self.assertEqual(my_dict, {'a': 1, 'b': 1})
+
+    def test_or(self):
+        with self.assertWarns(DeprecationWarning):
+            merged = self.deprecated_dict | {'a': 1, 'e': 2}
+
+        self.assertIsInstance(merged, deprecate_keys)
+        self.assertEqual(dict(dict.items(merged)), {**self.regular_dict, 'a': 1, 'e': 2})
+        with self.assertWarns(DeprecationWarning):
+            merged['b']
+        with self.assertWarns(DeprecationWarning):
+            self.deprecated_dict['a']
+
+        self.assertIs(self.deprecated_dict.__or__([('a', 1)]), NotImplemented)
+
+    def test_ior(self):
+        original = self.deprecated_dict
+        with self.assertWarns(DeprecationWarning):
+            self.deprecated_dict |= [('a', 1)]
+
+        self.assertIs(self.deprecated_dict, original)
+        with self.assertNotWarns(DeprecationWarning):
+            self.assertEqual(self.deprecated_dict['a'], 1)
+
     def test_items(self):
         with self.assertWarns(DeprecationWarning):
             self.assertEqual(self.deprecated_dict.items(), self.regular_dict.items())
@@ -195,25 +439,72 @@ class deprecate_keys_test_case(unittest.TestCase):
         with self.assertWarns(DeprecationWarning):
             self.assertEqual(self.deprecated_dict.keys(), self.regular_dict.keys())
 
+    def test_len(self):
+        with self.assertNotWarns(DeprecationWarning):
+            self.assertEqual(len(self.deprecated_dict), len(self.regular_dict))
+
+    def test_views_warn_lazily(self):
+        for view in (self.deprecated_dict.keys(), self.deprecated_dict.values(), self.deprecated_dict.items()):
+            with self.assertNotWarns(DeprecationWarning):
+                self.assertEqual(len(view), len(self.regular_dict))
+
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter('always')
+                for _ in view:
+                    pass
+                self.assertEqual(len(w), 2)
+
+    def test_views_dict_api(self):
+        my_dict = deprecate_keys({f'key {i}': i for i in range(20)}, dkey('key 5'), dkey('key 15'))
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            self.assertEqual(list(reversed(my_dict)), [f'key {i}' for i in reversed(range(20))])
+            self.assertEqual(list(reversed(my_dict.keys())), [f'key {i}' for i in reversed(range(20))])
+            self.assertEqual(list(reversed(my_dict.values())), list(reversed(range(20))))
+            self.assertEqual(list(reversed(my_dict.items())), [(f'key {i}', i) for i in reversed(range(20))])
+            self.assertEqual(len(w), 8)
+
+            iterator = reversed(my_dict.keys())
+            self.assertEqual(list(islice(iterator, 4)), ['key 19', 'key 18', 'key 17', 'key 16'])
+            self.assertEqual(len(w), 8)
+
+            for view in (my_dict.keys(), my_dict.values(), my_dict.items()):
+                self.assertIs(type(view.mapping), types.MappingProxyType)
+                self.assertEqual(view.mapping, my_dict)
+            self.assertEqual(repr(my_dict.keys()), repr(dict(dict.items(my_dict)).keys()))
+            self.assertEqual(repr(my_dict.items()), repr(dict(dict.items(my_dict)).items()))
+            self.assertEqual(len(w), 8)
+
+    def test_items_view_partial_scan(self):
+        my_dict = deprecate_keys({'a': 12, 'b': 13}, dkey('b'))
+        with self.assertNotWarns(DeprecationWarning):
+            self.assertEqual(next(iter(my_dict.items())), ('a', 12))
+
     def test_equality(self):
-        with self.assertWarns(DeprecationWarning):
+        with self.assertNotWarns(DeprecationWarning):
             self.assertTrue(self.deprecated_dict == self.regular_dict)
-
-        with self.assertWarns(DeprecationWarning):
             self.assertTrue(self.deprecated_dict == self.deprecated_dict)
-
-        with self.assertWarns(DeprecationWarning):
             self.assertTrue(self.regular_dict == self.deprecated_dict)
+            self.assertTrue(self.deprecated_dict == self.deprecated_dict.copy())
+            self.assertFalse(self.deprecated_dict == {})
+            self.assertFalse(self.deprecated_dict == dict(self.regular_dict, a=0))
+            self.assertFalse(self.deprecated_dict == list(self.regular_dict.items()))
 
     def test_inequality(self):
-        with self.assertWarns(DeprecationWarning):
+        with self.assertNotWarns(DeprecationWarning):
             self.assertFalse(self.deprecated_dict != self.regular_dict)
-
-        with self.assertWarns(DeprecationWarning):
             self.assertFalse(self.deprecated_dict != self.deprecated_dict)
-
-        with self.assertWarns(DeprecationWarning):
             self.assertFalse(self.regular_dict != self.deprecated_dict)
+            self.assertTrue(self.deprecated_dict != {})
+            self.assertTrue(self.deprecated_dict != dict(self.regular_dict, a=0))
+            self.assertTrue(self.deprecated_dict != list(self.regular_dict.items()))
+
+    def test_equality_does_not_warn(self):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            self.deprecated_dict == self.deprecated_dict.copy()
+            self.deprecated_dict != self.regular_dict
+            self.assertEqual(len(w), 0)
 
     def test_custom_warning_type(self):
         my_dict = deprecate_keys({'a': 12}, dkey('a', warning_type=UserWarning))
@@ -247,3 +538,1080 @@ class deprecate_keys_test_case(unittest.TestCase):
         my_dict = deprecate_keys({'a': 12}, dkey('a', details=details))
         with self.assertWarnsRegex(DeprecationWarning, details):
             self.assertEqual(my_dict['a'], 12)
+
+class alias_test_case(unittest.TestCase):
+    def setUp(self):
+        self.deprecated_dict = deprecate_keys({'a': 12, 'c': 13, 'd': 14}, dkey('b', 'c'), dkey('d'), alias=True)
+
+    def test_single_storage(self):
+        self.assertEqual(dict(dict.items(self.deprecated_dict)), {'a': 12, 'c': 13, 'd': 14})
+        self.assertEqual(len(self.deprecated_dict), 3)
+
+    def test_old_key_given(self):
+        my_dict = deprecate_keys({'b': 12, 'c': 13}, dkey('b', 'c'), alias=True)
+        self.assertEqual(dict(dict.items(my_dict)), {'c': 13})
+        self.assertEqual(len(my_dict), 1)
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(my_dict['b'], 13)
+
+        my_dict = deprecate_keys({'b': 12, 'c': 13}, alias=True)
+        my_dict.deprecate(dkey('b', 'c'))
+        self.assertEqual(dict(dict.items(my_dict)), {'c': 13})
+
+    def test_read(self):
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(self.deprecated_dict['b'], 13)
+
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(self.deprecated_dict.get('b'), 13)
+
+        with self.assertWarns(DeprecationWarning):
+            self.assertTrue('b' in self.deprecated_dict)
+
+    def test_write(self):
+        with self.assertWarns(DeprecationWarning):
+            self.deprecated_dict['b'] = 100
+
+        self.assertEqual(self.deprecated_dict['c'], 100)
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(self.deprecated_dict['b'], 100)
+
+    def test_delete(self):
+        with self.assertWarns(DeprecationWarning):
+            del self.deprecated_dict['b']
+
+        self.assertFalse('c' in self.deprecated_dict)
+        with self.assertWarns(DeprecationWarning):
+            self.assertFalse('b' in self.deprecated_dict)
+
+    def test_update(self):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            self.deprecated_dict.update({'b': 100, 'd': 15})
+            self.assertEqual(len(w), 2)
+
+        self.assertEqual(dict(dict.items(self.deprecated_dict)), {'a': 12, 'c': 100, 'd': 15})
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(self.deprecated_dict['b'], 100)
+
+    def test_update_last_value_wins(self):
+        with self.assertWarns(DeprecationWarning):
+            self.deprecated_dict.update([('b', 100), ('c', 101)])
+        self.assertEqual(self.deprecated_dict['c'], 101)
+
+        with self.assertWarns(DeprecationWarning):
+            self.deprecated_dict.update([('c', 102), ('b', 103)])
+        self.assertEqual(self.deprecated_dict['c'], 103)
+
+    def test_setdefault(self):
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(self.deprecated_dict.setdefault('b', 100), 13)
+        self.assertEqual(len(self.deprecated_dict), 3)
+
+    def test_removed_key(self):
+        with self.assertWarns(DeprecationWarning):
+            self.deprecated_dict['d'] = 15
+
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            self.assertEqual(self.deprecated_dict['d'], 15)
+            self.assertEqual(len(w), 0)
+
+    def test_copy(self):
+        dict_copy = self.deprecated_dict.copy()
+        self.assertEqual(dict(dict.items(dict_copy)), dict(dict.items(self.deprecated_dict)))
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(dict_copy['b'], 13)
+
+class deprecation_schema_test_case(unittest.TestCase):
+    def setUp(self):
+        self.schema = deprecation_schema(dkey('a'), dkey('b', 'c'))
+
+    def test_len(self):
+        self.assertEqual(len(self.schema), 2)
+        self.assertEqual(len(deprecation_schema(self.schema, dkey('d'))), 3)
+
+    def test_wrong_new_key(self):
+        with self.assertRaises(ValueError):
+            deprecate_keys({'a': 12}, self.schema)
+
+    def test_shared(self):
+        first = deprecate_keys({'a': 12, 'c': 13}, self.schema)
+        second = deprecate_keys({'a': 14, 'c': 15}, self.schema)
+        self.assertIs(first._key_mappings, second._key_mappings)
+
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(first['b'], 13)
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(second['b'], 15)
+
+    def test_copy_on_write(self):
+        first = deprecate_keys({'a': 12, 'c': 13}, self.schema)
+        second = deprecate_keys({'a': 14, 'c': 15}, self.schema)
+
+        with self.assertWarns(DeprecationWarning):
+            first['a'] = 16
+        self.assertIsNot(first._key_mappings, second._key_mappings)
+
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            self.assertEqual(first['a'], 16)
+            self.assertEqual(len(w), 0)
+
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(second['a'], 14)
+
+        self.assertEqual(len(self.schema), 2)
+
+    def test_multiple_old_keys(self):
+        my_dict = deprecate_keys({'c': 13}, dkey('a', 'c'), dkey('b', 'c'))
+        for key in ('a', 'b'):
+            with self.assertWarns(DeprecationWarning):
+                self.assertEqual(my_dict[key], 13)
+
+    def test_expired_dropped(self):
+        deprecations = (dkey('fax', removed_in='2.0'), dkey('name', 'last name', removed_in='3.0'),
+                        dkey('port', path=('db',), removed_in=(1, 5)), dkey('a'))
+        for version in ('2.0', '2.0.0', '2.1rc1', (2, 0), 2):
+            schema = deprecation_schema(*deprecations, current_version=version)
+            self.assertEqual(set(schema._key_mappings), {'name', 'a'})
+            self.assertEqual(schema._children, {})
+
+        self.assertEqual(len(deprecation_schema(*deprecations, current_version='1.4.9')), 4)
+        self.assertEqual(len(deprecation_schema(deprecation_schema(*deprecations), current_version='1.9')), 3)
+
+        # Expired keys are plain keys again.
+        schema = deprecation_schema(*deprecations, current_version='2.0')
+        my_dict = deprecate_keys({'fax': 1, 'last name': 'Smith', 'a': 2}, schema)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            self.assertEqual(my_dict['fax'], 1)
+            self.assertEqual(len(w), 0)
+
+        schema = deprecation_schema(*deprecations, current_version='3.0')
+        self.assertNotIn('name', deprecate_keys({'last name': 'Smith', 'a': 2}, schema))
+
+    def test_expired_raise(self):
+        schema = deprecation_schema(dkey('fax', removed_in='2.0'), dkey('telex', removed_in='1.0'))
+        with self.assertRaisesRegex(ValueError, '`fax`, `telex`'):
+            deprecation_schema(schema, current_version='2.0', on_expired='raise')
+        self.assertEqual(len(deprecation_schema(schema, current_version='1.9', on_expired='drop')), 1)
+        deprecation_schema(schema, current_version='0.9', on_expired='raise')
+
+    def test_invalid_expiry(self):
+        with self.assertRaises(ValueError):
+            deprecation_schema(dkey('fax'), current_version='2.0', on_expired='warn')
+        with self.assertRaises(ValueError):
+            deprecation_schema(dkey('fax'), current_version='dev')
+
+    def test_pre_releases_and_free_text(self):
+        deprecations = (dkey('fax', removed_in='2.0'), dkey('telex', removed_in='next major'))
+        for version in ('2.0rc1', '2.0.dev3', '2.0b1', '1.9.post2'):
+            self.assertEqual(len(deprecation_schema(*deprecations, current_version=version)), 2)
+        for version in ('2.0', '2.0.post1', '2.0+local', 'v3'):
+            schema = deprecation_schema(*deprecations, current_version=version, on_expired='drop')
+            self.assertEqual(set(schema._key_mappings), {'telex'})
+
+class emission_policy_test_case(unittest.TestCase):
+    def setUp(self):
+        self.deprecated_dict = deprecate_keys({'a': 12, 'c': 13}, dkey('a'), dkey('b', 'c'))
+
+    def tearDown(self):
+        set_emission_policy('always')
+
+    def count_warnings(self, accesses):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            for access in accesses:
+                access()
+            return len(w)
+
+    def test_always(self):
+        self.assertEqual(self.count_warnings([lambda: self.deprecated_dict['a']] * 3), 3)
+
+    def test_once_per_key(self):
+        set_emission_policy('once per key')
+        accesses = [lambda: self.deprecated_dict['a'], lambda: self.deprecated_dict['b']] * 3
+        self.assertEqual(self.count_warnings(accesses), 2)
+
+    def test_once_per_call_site(self):
+        set_emission_policy('once per call site')
+        first_site = lambda: self.deprecated_dict['a']
+        second_site = lambda: self.deprecated_dict['a']
+        self.assertEqual(self.count_warnings([first_site, second_site, first_site, second_site]), 2)
+
+    def test_unhashable_version(self):
+        my_dict = deprecate_keys({'a': 12}, dkey('a', deprecated_in=[1, 0]))
+        for policy in ('once per key', 'once per call site'):
+            set_emission_policy(policy)
+            self.assertEqual(self.count_warnings([lambda: my_dict['a']] * 2), 1)
+
+    def test_once_per_process(self):
+        set_emission_policy('once per process')
+        accesses = [lambda: self.deprecated_dict['a'], lambda: self.deprecated_dict['b']] * 3
+        self.assertEqual(self.count_warnings(accesses), 1)
+
+    def test_eviction(self):
+        set_emission_policy('once per key', cache_size=1)
+        accesses = [lambda: self.deprecated_dict['a'], lambda: self.deprecated_dict['b']] * 2
+        self.assertEqual(self.count_warnings(accesses), 4)
+
+    def test_setting_policy_resets_cache(self):
+        set_emission_policy('once per key')
+        self.assertEqual(self.count_warnings([lambda: self.deprecated_dict['a']]), 1)
+        set_emission_policy('once per key')
+        self.assertEqual(self.count_warnings([lambda: self.deprecated_dict['a']]), 1)
+
+    def test_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            set_emission_policy('sometimes')
+
+        with self.assertRaises(ValueError):
+            set_emission_policy('always', cache_size=0)
+
+    def test_warning_location(self):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            self.deprecated_dict['a']
+            list(self.deprecated_dict.items())
+            self.assertEqual([warning.filename for warning in w], [__file__] * 3)
+
+class deprecation_proxy_test_case(unittest.TestCase):
+    def setUp(self):
+        self.wrapped = {'a': 12, 'c': 13, 'd': 14}
+        self.proxy = deprecation_proxy(self.wrapped, dkey('b', 'c'), dkey('d'))
+
+    def test_is_mutable_mapping(self):
+        self.assertIsInstance(self.proxy, MutableMapping)
+
+    def test_wrong_new_key(self):
+        with self.assertRaises(ValueError):
+            deprecation_proxy(self.wrapped, dkey('e', 'f'))
+
+    def test_no_copy(self):
+        self.wrapped['a'] = 15
+        self.assertEqual(self.proxy['a'], 15)
+
+        self.proxy['a'] = 16
+        self.assertEqual(self.wrapped['a'], 16)
+
+    def test_read(self):
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(self.proxy['b'], 13)
+
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(self.proxy.get('b'), 13)
+
+        with self.assertWarns(DeprecationWarning):
+            self.assertTrue('b' in self.proxy)
+
+    def test_write_alias(self):
+        with self.assertWarns(DeprecationWarning):
+            self.proxy['b'] = 100
+
+        self.assertEqual(self.wrapped, {'a': 12, 'c': 100, 'd': 14})
+
+    def test_delete_alias(self):
+        with self.assertWarns(DeprecationWarning):
+            del self.proxy['b']
+
+        self.assertEqual(self.wrapped, {'a': 12, 'd': 14})
+
+    def test_removed_key(self):
+        with self.assertWarns(DeprecationWarning):
+            self.proxy['d'] = 15
+
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            self.assertEqual(self.proxy['d'], 15)
+            self.assertEqual(len(w), 0)
+
+    def test_iteration(self):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            self.assertEqual(len(self.proxy), 3)
+            self.assertEqual(len(w), 0)
+            self.assertEqual(list(self.proxy), ['a', 'c', 'd'])
+            self.assertEqual(len(w), 1)
+            self.assertEqual(list(self.proxy.items()), [('a', 12), ('c', 13), ('d', 14)])
+            self.assertEqual(len(w), 2)
+
+    def test_equality(self):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            self.assertTrue(self.proxy == {'a': 12, 'c': 13, 'd': 14})
+            self.assertTrue(self.proxy == deprecation_proxy(self.wrapped))
+            self.assertEqual(len(w), 0)
+
+class without_deprecations_test_case(unittest.TestCase):
+    def test_no_deprecations(self):
+        my_dict = deprecate_keys({'a': 12})
+        self.assertIsInstance(my_dict, deprecate_keys)
+        self.assertIs(type(my_dict).__getitem__, dict.__getitem__)
+
+    def test_last_deprecation_removed(self):
+        my_dict = deprecate_keys({'a': 12, 'c': 13}, dkey('a'), dkey('b', 'c'))
+        with self.assertWarns(DeprecationWarning):
+            my_dict['a'] = 14
+        self.assertIs(type(my_dict), deprecate_keys)
+
+        with self.assertWarns(DeprecationWarning):
+            my_dict.pop('b')
+        self.assertIsNot(type(my_dict), deprecate_keys)
+        self.assertIsInstance(my_dict, deprecate_keys)
+        self.assertEqual(my_dict, {'a': 14, 'c': 13})
+
+    def test_clear(self):
+        my_dict = deprecate_keys({'a': 12}, dkey('a'))
+        my_dict.clear()
+        self.assertIsNot(type(my_dict), deprecate_keys)
+
+    def test_deprecate_again(self):
+        my_dict = deprecate_keys({'a': 12, 'c': 13})
+        my_dict.deprecate(dkey('a'), dkey('b', 'c'))
+        self.assertIs(type(my_dict), deprecate_keys)
+
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(my_dict['b'], 13)
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(my_dict['a'], 12)
+
+        with self.assertRaises(ValueError):
+            my_dict.deprecate(dkey('d', 'e'))
+
+    def test_copy(self):
+        my_dict = deprecate_keys({'a': 12}, dkey('a'))
+        self.assertIs(type(my_dict.copy()), deprecate_keys)
+
+        my_dict.clear()
+        self.assertIs(type(my_dict.copy()), type(my_dict))
+        self.assertIs(type(copy.deepcopy(my_dict)), type(my_dict))
+
+    def test_plain_update(self):
+        my_dict = deprecate_keys({'a': 12})
+        self.assertIs(type(my_dict).update, dict.update)
+        self.assertIs(type(my_dict).setdefault, dict.setdefault)
+        my_dict.update({'b': 13}, c=14)
+        self.assertEqual(my_dict, {'a': 12, 'b': 13, 'c': 14})
+
+        merged = my_dict | {'d': 15}
+        self.assertIsInstance(merged, deprecate_keys)
+        my_dict |= {'d': 15}
+        self.assertEqual(merged, my_dict)
+
+    def test_class_name(self):
+        for cls in (deprecate_keys, frozen_deprecate_keys):
+            my_dict = cls({'a': 12})
+            self.assertIsNot(type(my_dict), cls)
+            self.assertIsInstance(my_dict, cls)
+            self.assertEqual(type(my_dict).__name__, cls.__name__)
+            self.assertEqual(type(my_dict).__qualname__, cls.__qualname__)
+
+            unpickled = pickle.loads(pickle.dumps(my_dict))
+            self.assertIsInstance(unpickled, cls)
+            self.assertIs(type(unpickled), type(my_dict))
+
+    def test_subclass_keeps_class(self):
+        class my_deprecate_keys(deprecate_keys):
+            pass
+
+        my_dict = my_deprecate_keys({'a': 12})
+        self.assertIs(type(my_dict), my_deprecate_keys)
+
+class frozen_test_case(unittest.TestCase):
+    def setUp(self):
+        self.frozen_dict = frozen_deprecate_keys({'a': 12, 'c': 13}, dkey('a'), dkey('b', 'c'))
+
+    def test_read(self):
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(self.frozen_dict['b'], 13)
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(self.frozen_dict.get('a'), 12)
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(set(self.frozen_dict), {'a', 'b', 'c'})
+
+        # Reading never removes a deprecation.
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(self.frozen_dict['b'], 13)
+
+    def test_mutation_rejected(self):
+        mutations = (
+            lambda d: d.__setitem__('a', 1), lambda d: d.__delitem__('a'), lambda d: d.pop('a'),
+            lambda d: d.popitem(), lambda d: d.clear(), lambda d: d.update({'e': 1}),
+            lambda d: d.setdefault('e', 1), lambda d: d.deprecate(dkey('e', 'c')), lambda d: d.__ior__({}),
+            lambda d: d.__init__({'q': 1}),
+        )
+        for frozen_dict in (self.frozen_dict, frozen_deprecate_keys({'a': 12}), frozen_deprecate_keys({'a': 12}) | {},
+                            copy.deepcopy(self.frozen_dict)):
+            for mutation in mutations:
+                with self.assertRaises(TypeError):
+                    mutation(frozen_dict)
+
+        self.assertEqual(dict(dict.items(self.frozen_dict)), {'a': 12, 'b': 13, 'c': 13})
+
+    def test_hash(self):
+        other = frozen_deprecate_keys({'a': 12, 'c': 13}, dkey('a'), dkey('b', 'c'))
+        self.assertEqual(hash(self.frozen_dict), hash(other))
+        self.assertEqual(dict(dict.items(self.frozen_dict)), dict(dict.items(other)))
+        self.assertEqual(hash(self.frozen_dict), hash(frozenset({'a': 12, 'b': 13, 'c': 13}.items())))
+        self.assertEqual(hash(frozen_deprecate_keys({'a': 12})), hash(frozenset({'a': 12}.items())))
+
+        with mock.patch('dkey._dkey.frozenset', create=True) as frozen_set:
+            hash(self.frozen_dict)
+            frozen_set.assert_not_called()
+
+        with self.assertRaises(TypeError):
+            hash(frozen_deprecate_keys({'a': []}))
+
+    def test_cache_key(self):
+        calls = []
+
+        @functools.lru_cache()
+        def load(settings):
+            calls.append(settings)
+            return len(settings)
+
+        load(self.frozen_dict)
+        load(frozen_deprecate_keys({'a': 12, 'c': 13}, dkey('a'), dkey('b', 'c')))
+        self.assertEqual(len(calls), 1)
+
+    def test_without_deprecations(self):
+        frozen_dict = frozen_deprecate_keys({'a': 12})
+        self.assertIsInstance(frozen_dict, frozen_deprecate_keys)
+        self.assertIs(type(frozen_dict).__getitem__, dict.__getitem__)
+        self.assertEqual(frozen_dict, {'a': 12})
+        self.assertEqual({frozen_dict: 1}[frozen_deprecate_keys({'a': 12})], 1)
+
+    def test_copies(self):
+        self.assertIs(copy.copy(self.frozen_dict), self.frozen_dict)
+
+        thawed = self.frozen_dict.copy()
+        self.assertIs(type(thawed), deprecate_keys)
+        with self.assertWarns(DeprecationWarning):
+            thawed['a'] = 1
+
+        with self.assertWarns(DeprecationWarning):
+            merged = self.frozen_dict | {'a': 1}
+        self.assertIsInstance(merged, frozen_deprecate_keys)
+        self.assertEqual(dict(dict.items(merged)), {'a': 1, 'b': 13, 'c': 13})
+        with self.assertWarns(DeprecationWarning):
+            merged['b']
+
+        deep = copy.deepcopy(self.frozen_dict)
+        self.assertIs(type(deep), frozen_deprecate_keys)
+        self.assertEqual(hash(deep), hash(self.frozen_dict))
+
+    def test_pickle(self):
+        restored = pickle.loads(pickle.dumps(self.frozen_dict))
+        self.assertIs(type(restored), frozen_deprecate_keys)
+        self.assertEqual(hash(restored), hash(self.frozen_dict))
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(restored['b'], 13)
+
+class nested_test_case(unittest.TestCase):
+    def setUp(self):
+        self.schema = deprecation_schema(dkey('db', 'database'), dkey('host name', 'host', path=('database',)),
+                                         dkey('size', 'max size', path=('database', 'pool')))
+        self.config = {'database': {'host': 'localhost', 'pool': {'max size': 10}}, 'cache': {'size': 1}}
+
+    def test_path(self):
+        record = dkey('size', 'max size', path=['database', 'pool'])
+        self.assertEqual(record.path, ('database', 'pool'))
+        self.assertEqual(dkey('size').path, ())
+        self.assertIn("Key `size` in ['database']['pool'] is deprecated.", record.warning_message)
+
+    def test_trie(self):
+        self.assertEqual(len(self.schema), 3)
+        self.assertEqual(set(self.schema._key_mappings), {'db'})
+        database = self.schema._children['database']
+        self.assertEqual(set(database._key_mappings), {'host name'})
+        self.assertEqual(set(database._children['pool']._key_mappings), {'size'})
+
+    def test_lazy_wrapping(self):
+        config = deprecate_keys(self.config, self.schema)
+        database = config['database']
+        self.assertIs(type(database), deprecation_proxy)
+        self.assertIs(type(database['pool']), deprecation_proxy)
+        with self.assertWarnsRegex(DeprecationWarning, r"Key `size` in \['database'\]\['pool'\]"):
+            self.assertEqual(database['pool']['size'], 10)
+
+        # Branches without deprecated keys stay plain dicts.
+        self.assertIs(config['cache'], self.config['cache'])
+
+        # Nothing is copied or stored.
+        self.assertIs(dict.__getitem__(config, 'database'), self.config['database'])
+        self.assertNotIn('size', self.config['database']['pool'])
+
+    def test_writes_reach_nested_dict(self):
+        inner = {'max': 1}
+        for alias in (False, True):
+            config = deprecate_keys({'db': inner}, dkey('database', 'db'), dkey('size', 'max', path=('db',)),
+                                    alias=alias)
+            with self.assertWarns(DeprecationWarning):
+                config['database']['max'] = 99
+            self.assertEqual(config['db']['max'], 99)
+            with self.assertWarns(DeprecationWarning):
+                config['db']['size'] = 100
+            self.assertEqual(inner, {'max': 100})
+
+    def test_removed_nested_key_keeps_warning(self):
+        config = deprecate_keys({'db': {'fax': 1}}, dkey('fax', path=('db',)))
+        with self.assertWarns(DeprecationWarning):
+            config['db']['fax'] = 2
+        # Each read returns a new proxy, so the nested dict does not remember the write.
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(config['db']['fax'], 2)
+
+    def test_get_and_setdefault(self):
+        config = deprecate_keys(self.config, self.schema)
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(config.get('database')['host name'], 'localhost')
+        self.assertEqual(config.setdefault('database'), self.config['database'])
+        self.assertIsNone(config.get('missing'))
+
+    def test_old_key(self):
+        for alias in (False, True):
+            config = deprecate_keys(self.config, self.schema, alias=alias)
+            with self.assertWarns(DeprecationWarning):
+                database = config['db']
+            with self.assertWarns(DeprecationWarning):
+                self.assertEqual(database['host name'], 'localhost')
+
+    def test_replaced_nested_dict(self):
+        config = deprecate_keys(self.config, self.schema)
+        config['database'] = {'host': 'remote', 'pool': {'max size': 1}}
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(config['database']['pool']['size'], 1)
+
+        # Reading never raises, even if a new key is missing now.
+        config['database'] = {'other': 3}
+        self.assertEqual(config['database']['other'], 3)
+
+    def test_missing_new_key(self):
+        with self.assertRaisesRegex(ValueError, r"dict\['database'\]\['pool'\]"):
+            deprecate_keys({'database': {'host': 'localhost', 'pool': {}}}, self.schema)
+        with self.assertRaises(ValueError):
+            deprecation_proxy({'database': {'pool': {'max size': 1}}}, self.schema)
+
+        # Paths that do not lead to dicts are skipped.
+        deprecate_keys({'database': {'host': 'localhost', 'pool': None}}, self.schema)
+
+    def test_deprecate(self):
+        config = deprecate_keys({'database': {'host': 'localhost', 'port': 1}})
+        config.deprecate(dkey('host name', 'host', path=('database',)))
+        self.assertIs(type(config), deprecate_keys)
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(config['database']['host name'], 'localhost')
+
+        config.deprecate(dkey('p', 'port', path=('database',)))
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(config['database']['p'], 1)
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(config['database']['host name'], 'localhost')
+
+    def test_copy_and_pickle(self):
+        config = deprecate_keys(self.config, self.schema)
+        for other in (config.copy(), copy.deepcopy(config), pickle.loads(pickle.dumps(config))):
+            with self.assertWarns(DeprecationWarning):
+                self.assertEqual(other['database']['pool']['size'], 10)
+
+        config.clear()
+        self.assertIs(type(config), dkey_module._without_deprecations)
+
+    def test_frozen(self):
+        config = frozen_deprecate_keys(self.config, self.schema)
+        self.assertIs(type(config['database']), deprecation_proxy)
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(config['database']['pool']['size'], 10)
+
+    def test_proxy(self):
+        proxy = deprecation_proxy(self.config, self.schema)
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(proxy['database']['pool']['size'], 10)
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(proxy.get('db')['host name'], 'localhost')
+        self.assertIs(type(self.config['database']), dict)
+        self.assertIs(proxy['cache'], self.config['cache'])
+
+    def test_migrate(self):
+        records = [{'db': {'host name': 'a', 'pool': {'size': 1}}}, {'database': {'host': 'b', 'pool': {}}}]
+        migrated = list(migrate(records, self.schema))
+        self.assertEqual(migrated[0], {'database': {'host': 'a', 'pool': {'max size': 1}}})
+        self.assertIs(migrated[1], records[1])
+        self.assertEqual(records[0], {'db': {'host name': 'a', 'pool': {'size': 1}}})
+
+        lines = [json.dumps(record) + '\n' for record in records]
+        self.assertEqual([json.loads(line) for line in migrate_jsonl(lines, self.schema)], migrated)
+
+
+class json_test_case(unittest.TestCase):
+    def setUp(self):
+        self.document = json.dumps({
+            'database': {'host': 'localhost', 'port': 5432},
+            'servers': {'web': {'timeout': 10}, 'worker': {'timeout': 20, 'queue': 'q'}},
+            'plugins': [{'name': 'a'}, {'name': 'b'}, 3],
+            'debug': False,
+        })
+
+    def test_root(self):
+        config = loads_json(self.document, dkey('db', 'database'), dkey('debug'))
+        self.assertIs(type(config), deprecate_keys)
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(config['db']['port'], 5432)
+        with self.assertWarns(DeprecationWarning):
+            self.assertFalse(config['debug'])
+        self.assertIs(type(config['database']), dict)
+
+    def test_paths(self):
+        config = loads_json(self.document, dkey('db', 'database'), paths={
+            ('database',): [dkey('host name', 'host')],
+            ('servers', ...): deprecation_schema(dkey('time out', 'timeout')),
+            ('plugins',): dkey('title', 'name'),
+            ('missing', 'path'): [dkey('x')],
+        })
+
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(config['database']['host name'], 'localhost')
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(config['database']['host name'], 'localhost')
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(config['servers']['worker']['time out'], 20)
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(config['plugins'][1]['title'], 'b')
+        self.assertEqual(config['plugins'][2], 3)
+
+        # Objects reached through objects only are not copied, the others right away.
+        self.assertIs(type(dict.__getitem__(config, 'database')), dict)
+        self.assertIs(type(dict.__getitem__(config, 'servers')['web']), deprecate_keys)
+
+        # The replaced old key refers to the same object.
+        with self.assertWarns(DeprecationWarning):
+            config['db']['host'] = 'remote'
+        self.assertEqual(config['database']['host'], 'remote')
+
+    def test_paths_like_dkey_path(self):
+        document = json.dumps({'database': {'pool': {'max size': 1}}})
+        for config in (loads_json(document, paths={('database', 'pool'): [dkey('size', 'max size')]}),
+                       loads_json(document, dkey('size', 'max size', path=('database', 'pool')))):
+            self.assertEqual(set(config._children), {'database'})
+            with self.assertWarnsRegex(DeprecationWarning, r"\['database'\]\['pool'\]"):
+                self.assertEqual(config['database']['pool']['size'], 1)
+
+    def test_overlapping_paths(self):
+        config = loads_json(self.document, paths={
+            ('servers', ...): [dkey('time out', 'timeout')],
+            ('servers', 'worker'): [dkey('q', 'queue')],
+        })
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(config['servers']['worker']['q'], 'q')
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(config['servers']['worker']['time out'], 20)
+
+    def test_alias(self):
+        config = loads_json(self.document, dkey('db', 'database'), alias=True,
+                            paths={('database',): [dkey('host name', 'host')]})
+        self.assertEqual(len(config), 4)
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(config['database']['host name'], 'localhost')
+
+    def test_missing_new_key(self):
+        with self.assertRaises(ValueError):
+            loads_json(self.document, paths={('database',): [dkey('user name', 'user')]})
+
+    def test_other_documents(self):
+        self.assertEqual(loads_json('[1, 2]'), [1, 2])
+        self.assertIs(type(loads_json('[{"a": 1}]')[0]), dict)
+        self.assertIs(type(loads_json('{"a": {"b": 1}}')), dict)
+        self.assertIs(type(loads_json(self.document, paths={('database',): []})['database']), dict)
+        self.assertEqual(loads_json('1.5', parse_float=str), '1.5')
+
+    def test_load(self):
+        config = load_json(io.StringIO(self.document), dkey('db', 'database'))
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(config['db']['port'], 5432)
+
+class migrate_test_case(unittest.TestCase):
+    def setUp(self):
+        self.deprecations = (dkey('name', 'last name'), dkey('fax'), dkey('mail', 'email'))
+
+    def test_records(self):
+        records = [
+            {'id': 1, 'name': 'Smith', 'fax': '123', 'age': 24},
+            {'id': 2, 'last name': 'Doe'},
+            {'id': 3, 'name': 'Old', 'last name': 'New', 'mail': 'a@b.c'},
+            [1, 2],
+        ]
+        migrated = list(migrate(iter(records), *self.deprecations))
+
+        self.assertEqual(migrated[0], {'id': 1, 'last name': 'Smith', 'age': 24})
+        self.assertEqual(list(migrated[0]), ['id', 'last name', 'age'])
+        self.assertIs(migrated[1], records[1])
+        self.assertEqual(migrated[2], {'id': 3, 'last name': 'New', 'email': 'a@b.c'})
+        self.assertEqual(migrated[3], [1, 2])
+        self.assertEqual(records[0], {'id': 1, 'name': 'Smith', 'fax': '123', 'age': 24})
+
+    def test_schema_and_wrapped_records(self):
+        schema = deprecation_schema(*self.deprecations)
+        record = deprecate_keys({'last name': 'Smith', 'fax': '1', 'email': ''}, schema)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            self.assertEqual(list(migrate([record], schema)), [{'last name': 'Smith', 'email': ''}])
+            self.assertEqual(len(w), 0)
+
+    def test_jsonl(self):
+        lines = [
+            '{"id": 1, "name": "Smith"}\n',
+            '{"id": 2, "note": "name"}\n',
+            '{"id": 3, "last name": "Doe"}\n',
+            '\n',
+            '{"id": 4, "fax": "1", "city": "Zürich"}\n',
+        ]
+        migrated = list(migrate_jsonl(lines, *self.deprecations))
+
+        self.assertEqual(json.loads(migrated[0]), {'id': 1, 'last name': 'Smith'})
+        self.assertIs(migrated[1], lines[1])
+        self.assertIs(migrated[2], lines[2])
+        self.assertEqual(migrated[3], '\n')
+        self.assertEqual(migrated[4], '{"id": 4, "city": "Zürich"}\n')
+
+    def test_jsonl_escaped_keys(self):
+        line = json.dumps({'näme': 1}) + '\n'
+        self.assertEqual(list(migrate_jsonl([line], dkey('näme', 'name'))), ['{"name": 1}\n'])
+
+    def test_jsonl_processes(self):
+        lines = [json.dumps({'id': i, 'name': str(i)}) + '\n' for i in range(50)]
+        migrated = list(migrate_jsonl(io.StringIO(''.join(lines)), *self.deprecations, processes=2, chunk_size=7))
+        self.assertEqual(migrated, list(migrate_jsonl(lines, *self.deprecations)))
+        self.assertEqual(json.loads(migrated[49]), {'id': 49, 'last name': '49'})
+
+class pickle_test_case(unittest.TestCase):
+    def setUp(self):
+        self.data = {f'key {i}': i for i in range(100)}
+        self.schema = deprecation_schema(*(dkey(f'old key {i}', f'key {i}') for i in range(10)), dkey('key 10'),
+                                         name='pickle test schema')
+
+    def assertSameDict(self, first, second):
+        self.assertIs(type(first), type(second))
+        self.assertEqual(dict(dict.items(first)), dict(dict.items(second)))
+        self.assertEqual(first._key_mappings, second._key_mappings)
+        self.assertEqual(first._alias, second._alias)
+
+    def round_trip(self, my_dict):
+        restored = pickle.loads(pickle.dumps(my_dict))
+        self.assertSameDict(restored, my_dict)
+        return restored
+
+    def test_named_schema(self):
+        my_dict = deprecate_keys(self.data, self.schema)
+        with mock.patch.object(deprecate_keys, '__init__') as init:
+            restored = self.round_trip(my_dict)
+            init.assert_not_called()
+
+        self.assertIs(restored._key_mappings, self.schema._key_mappings)
+        self.assertLess(len(pickle.dumps(my_dict)), 1.1 * len(pickle.dumps(self.data)))
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(restored['old key 3'], 3)
+
+    def test_forgotten_keys(self):
+        my_dict = deprecate_keys(self.data, self.schema)
+        with self.assertWarns(DeprecationWarning):
+            my_dict['old key 3'] = 100
+        with self.assertWarns(DeprecationWarning):
+            del my_dict['old key 4']
+        my_dict['key 5'] = 101
+
+        restored = self.round_trip(my_dict)
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(restored['old key 5'], 5)
+
+    def test_alias(self):
+        my_dict = deprecate_keys(self.data, self.schema, alias=True)
+        self.round_trip(my_dict)
+
+    def test_unnamed_schema(self):
+        my_dict = deprecate_keys({'a': 1, 'c': 2}, dkey('a', details='Unnamed.'), dkey('b', 'c', warning_type='end user'))
+        restored = self.round_trip(my_dict)
+        with self.assertWarnsRegex(FutureWarning, 'Use `c` from now on.'):
+            self.assertEqual(restored['b'], 2)
+
+    def test_without_deprecations(self):
+        my_dict = deprecate_keys(self.data)
+        self.round_trip(my_dict)
+
+    def test_subclass(self):
+        class_name = 'pickled_deprecate_keys'
+        globals()[class_name] = type(class_name, (deprecate_keys,), {'__qualname__': class_name})
+        self.addCleanup(globals().pop, class_name)
+
+        my_dict = globals()[class_name](self.data, self.schema)
+        my_dict.note = 'kept'
+        self.assertEqual(self.round_trip(my_dict).note, 'kept')
+
+    def test_unknown_schema(self):
+        schema = deprecation_schema(dkey('a'), name='pickle test unknown')
+        pickled = pickle.dumps(deprecate_keys({'a': 1}, schema))
+        del dkey_module._schemas['pickle test unknown']
+        with self.assertRaises(ValueError):
+            pickle.loads(pickled)
+
+class collect_deprecations_test_case(unittest.TestCase):
+    def setUp(self):
+        self.removed = dkey('a')
+        self.replaced = dkey('b', 'c')
+        self.deprecated_dict = deprecate_keys({'a': 12, 'c': 13}, self.removed, self.replaced)
+
+    def test_records_hits(self):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            with collect_deprecations() as hits:
+                self.deprecated_dict['a']
+                self.deprecated_dict.get('b')
+                self.deprecated_dict['c']
+            self.deprecated_dict['b']
+
+            self.assertEqual(hits, [self.removed, self.replaced])
+            self.assertEqual(len(w), 3)
+
+    def test_without_warnings(self):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            with collect_deprecations(warn=False) as hits:
+                self.deprecated_dict['a']
+                list(self.deprecated_dict)
+
+            self.assertEqual(hits, [self.removed, self.removed, self.replaced])
+            self.assertEqual(len(w), 0)
+
+    def test_nested(self):
+        with collect_deprecations(warn=False) as outer:
+            self.deprecated_dict['a']
+            with collect_deprecations(warn=False) as inner:
+                self.deprecated_dict['b']
+
+        self.assertEqual(outer, [self.removed, self.replaced])
+        self.assertEqual(inner, [self.replaced])
+
+    def test_proxy(self):
+        proxy = deprecation_proxy({'c': 13}, self.replaced)
+        with collect_deprecations(warn=False) as hits:
+            proxy['b']
+        self.assertEqual(hits, [self.replaced])
+
+    def test_threads_record_separately(self):
+        results = {}
+
+        def work(key):
+            with collect_deprecations(warn=False) as hits:
+                for _ in range(100):
+                    self.deprecated_dict.get(key)
+            results[key] = hits
+
+        threads = [threading.Thread(target=work, args=(key,)) for key in ('a', 'b')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, {'a': [self.removed] * 100, 'b': [self.replaced] * 100})
+
+    def test_tasks_record_separately(self):
+        async def work(key):
+            async with collect_deprecations(warn=False) as hits:
+                for _ in range(10):
+                    self.deprecated_dict.get(key)
+                    await asyncio.sleep(0)
+            return hits
+
+        async def main():
+            return await asyncio.gather(work('a'), work('b'))
+
+        self.assertEqual(asyncio.run(main()), [[self.removed] * 10, [self.replaced] * 10])
+
+class thread_safety_test_case(unittest.TestCase):
+    def setUp(self):
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, interval)
+
+        catcher = warnings.catch_warnings()
+        catcher.__enter__()
+        self.addCleanup(catcher.__exit__, None, None, None)
+        warnings.simplefilter('ignore')
+
+        self.schema = deprecation_schema(*(dkey(f'old {i}', f'new {i}') for i in range(200)))
+
+    def run_threads(self, target, number=8):
+        errors = []
+        barrier = threading.Barrier(number)
+
+        def run(index):
+            try:
+                barrier.wait()
+                target(index)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=run, args=(index,)) for index in range(number)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+
+    def test_concurrent_writers_and_readers(self):
+        for alias in (False, True):
+            my_dict = deprecate_keys({f'new {i}': i for i in range(200)}, self.schema, alias=alias)
+
+            def work(index):
+                for i in range(200):
+                    if index % 2:
+                        my_dict[f'old {i}'] = index
+                        my_dict.update({f'old {(i + 1) % 200}': index})
+                    else:
+                        my_dict.get(f'old {i}')
+                        f'old {i}' in my_dict
+                        for _ in my_dict.items():
+                            pass
+
+            self.run_threads(work)
+            self.assertEqual(len(my_dict._key_mappings), 200 if alias else 0)
+
+    def test_concurrent_removal(self):
+        for _ in range(10):
+            my_dict = deprecate_keys({f'new {i}': i for i in range(200)}, self.schema)
+
+            def work(index):
+                for i in range(200):
+                    my_dict.pop(f'old {i}', None)
+                    if index < 2 and i % 4 == 0:
+                        my_dict.popitem()
+
+            self.run_threads(work)
+            self.assertEqual(my_dict._key_mappings, {})
+            self.assertIsNot(type(my_dict), deprecate_keys)
+
+    def test_concurrent_emission_cache(self):
+        self.addCleanup(set_emission_policy, 'always')
+        my_dict = deprecate_keys({f'new {i}': i for i in range(200)}, self.schema, alias=True)
+
+        for policy in ('once per key', 'once per call site', 'once per process'):
+            set_emission_policy(policy, cache_size=16)
+            self.run_threads(lambda index: [my_dict[f'old {i}'] for i in range(200)])
+            self.assertLessEqual(len(dkey_module._emitted), 16)
+
+    def test_concurrent_nested_wrapping(self):
+        schema = deprecation_schema(*(dkey('old', 'new', path=(f'section {i}',)) for i in range(200)))
+        for _ in range(10):
+            sections = {f'section {i}': {'new': i} for i in range(200)}
+            my_dict = deprecate_keys(sections, schema)
+
+            def work(index):
+                for i in range(200):
+                    section = my_dict[f'section {i}']
+                    section[f'thread {index}'] = index
+                    section['old'] = index
+
+            self.run_threads(work)
+            # All threads wrote to the same nested dicts, so no write was lost.
+            for section in sections.values():
+                self.assertEqual(len(section), 9)
+
+    def test_clear_runs_finalizers_without_lock(self):
+        other = deprecate_keys({'new': 0}, dkey('old', 'new'))
+
+        class finalized:
+            def __del__(self):
+                other['old'] = 1
+
+        my_dict = deprecate_keys({'new': finalized()}, dkey('old', 'new'), alias=True)
+        thread = threading.Thread(target=my_dict.clear, daemon=True)
+        thread.start()
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(other._key_mappings, {})
+
+class disabled_test_case(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch('dkey._dkey._disabled', True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assertNoWarnings(self, access):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            result = access()
+            self.assertEqual(len(w), 0)
+        return result
+
+    def test_no_message(self):
+        with mock.patch('dkey._dkey._format_message') as format_message:
+            my_dict = deprecate_keys({'b': 13}, dkey('disabled a', 'b'))
+            self.assertEqual(self.assertNoWarnings(lambda: my_dict['disabled a']), 13)
+            format_message.assert_not_called()
+
+    def test_plain_dict_methods(self):
+        my_dict = deprecate_keys({'a': 12, 'c': 13}, dkey('a'), dkey('b', 'c'))
+        self.assertIs(type(my_dict).__getitem__, dict.__getitem__)
+        self.assertEqual(self.assertNoWarnings(lambda: my_dict['b']), 13)
+        self.assertEqual(self.assertNoWarnings(lambda: my_dict['a']), 12)
+
+    def test_alias(self):
+        my_dict = deprecate_keys({'a': 12, 'c': 13}, dkey('a'), dkey('b', 'c'), alias=True)
+        self.assertIsInstance(my_dict, deprecate_keys)
+        self.assertIs(type(my_dict).__iter__, dict.__iter__)
+        self.assertEqual(len(my_dict), 2)
+        self.assertEqual(self.assertNoWarnings(lambda: my_dict['b']), 13)
+        self.assertEqual(self.assertNoWarnings(lambda: my_dict['a']), 12)
+
+        self.assertNoWarnings(lambda: my_dict.__setitem__('b', 5))
+        self.assertEqual(my_dict['c'], 5)
+        self.assertNoWarnings(lambda: my_dict.update({'b': 6}))
+        self.assertEqual(my_dict, {'a': 12, 'c': 6})
+        self.assertTrue('b' in my_dict)
+        self.assertEqual(my_dict.get('b'), 6)
+        self.assertEqual(my_dict.setdefault('b', 7), 6)
+        self.assertEqual(my_dict.copy().get('b'), 6)
+        self.assertEqual(pickle.loads(pickle.dumps(my_dict)).get('b'), 6)
+
+        self.assertEqual(my_dict.pop('b'), 6)
+        self.assertFalse('c' in my_dict)
+        self.assertEqual(my_dict.pop('b', None), None)
+
+        my_dict = deprecate_keys({'b': 12, 'c': 13}, alias=True)
+        my_dict.deprecate(dkey('b', 'c'))
+        self.assertEqual(my_dict, {'c': 13})
+        self.assertEqual(my_dict['b'], 13)
+
+    def test_deprecate(self):
+        my_dict = deprecate_keys({'c': 13})
+        my_dict.deprecate(dkey('b', 'c'))
+        self.assertEqual(self.assertNoWarnings(lambda: my_dict['b']), 13)
+
+    def test_proxy(self):
+        proxy = deprecation_proxy({'c': 13}, dkey('b', 'c'))
+        self.assertEqual(self.assertNoWarnings(lambda: proxy['b']), 13)
+
+    def test_nested(self):
+        for alias in (False, True):
+            source = {'a': {'c': 13}}
+            my_dict = deprecate_keys(source, dkey('b', 'c', path=('a',)), dkey('old a', 'a'), alias=alias)
+            self.assertIs(type(my_dict).__iter__, dict.__iter__)
+            self.assertEqual(self.assertNoWarnings(lambda: my_dict['a']['b']), 13)
+            self.assertEqual(self.assertNoWarnings(lambda: my_dict['old a']['b']), 13)
+            self.assertEqual(my_dict.get('a')['b'], 13)
+
+            # Nested dicts are referenced, not copied.
+            self.assertIs(dict.__getitem__(my_dict, 'a'), source['a'])
+            my_dict['a']['port'] = 2
+            my_dict['a']['b'] = 14
+            self.assertEqual(source['a'], {'c': 14, 'port': 2})
+
+        my_dict = deprecate_keys({'a': {'c': 13}})
+        my_dict.deprecate(dkey('b', 'c', path=('a',)))
+        self.assertEqual(my_dict['a']['b'], 13)
+        self.assertEqual(pickle.loads(pickle.dumps(my_dict))['a']['b'], 13)
+
+    def test_still_validates(self):
+        with self.assertRaises(ValueError):
+            deprecate_keys({'a': 12}, dkey('b', 'c'))